@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+
+import pygame
+
+from game_engine import CACHE_DIR
+from serialization import atomic_write
+
+# Assets are resolved relative to this file, not the current working directory
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+SOUND_DIR = os.path.join(ASSET_DIR, "sounds")
+
+SOUND_FILES = {
+    "dice": "dice-142528.mp3",
+    "move": "old-men-arm-move-97741.mp3",
+    "snake": "snake-hissing-high-quality-240154.mp3",
+    "ladder": "ladder-82581.mp3",
+    "win": "win-176035.mp3",
+}
+
+CHANNEL_COUNT = 8
+
+# SysFont scans every installed font; the paths it finds are kept across runs
+FONT_CACHE_PATH = os.path.join(CACHE_DIR, "fonts.json")
+
+_font_paths = None
+
+
+def _load_font_paths():
+    global _font_paths
+    if _font_paths is None:
+        try:
+            with open(FONT_CACHE_PATH) as f:
+                _font_paths = json.load(f)
+        except (OSError, ValueError):
+            _font_paths = {}
+    return _font_paths
+
+
+def _font_choice(path, size, bold, italic):
+    # SysFont constructor that just reports what SysFont decided to open
+    return [path, bool(bold), bool(italic)]
+
+
+def resolve_font(name, bold=False, italic=False):
+    # (path, synthetic bold, synthetic italic) exactly as SysFont would pick
+    # them; path is None for pygame's default font
+    paths = _load_font_paths()
+    key = f"{name}|{int(bold)}|{int(italic)}"
+    cached = paths.get(key)
+    if cached is not None and cached[0] is not None and os.path.exists(cached[0]):
+        return cached
+
+    choice = pygame.font.SysFont(name, 0, bold, italic, constructor=_font_choice)
+    if choice[0] is None:
+        # Not found, or the font list could not be read (no fc-list, say).
+        # Nothing is stored so the font is looked for again next run
+        return choice
+    paths[key] = choice
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        atomic_write(FONT_CACHE_PATH, json.dumps(paths).encode())
+    except OSError:
+        pass  # Without a writable cache we simply scan again next run
+    return choice
+
+
+class LazyFont:
+    # Font that is only looked up and opened the first time it is used
+    def __init__(self, name, size, bold=False, italic=False, timer=None):
+        self.name = name
+        self.size_pt = size
+        self.bold = bold
+        self.italic = italic
+        self.timer = timer
+        self.font = None
+
+    def load(self):
+        if self.font is None:
+            start = time.perf_counter()
+            if not pygame.font.get_init():
+                pygame.font.init()
+            path, fake_bold, fake_italic = resolve_font(self.name, self.bold, self.italic)
+            self.font = pygame.font.Font(path, self.size_pt)
+            self.font.set_bold(fake_bold)
+            self.font.set_italic(fake_italic)
+            if self.timer is not None:
+                self.timer(f"font {self.name} {self.size_pt}", time.perf_counter() - start)
+        return self.font
+
+    def render(self, *args, **kwargs):
+        return self.load().render(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # Everything else (size, get_height, ...) goes to the real font
+        return getattr(self.load(), attr)
+
+
+class SoundHandle:
+    # Stand-in returned before a sound is decoded; play() never blocks and is
+    # silently skipped until the background loader has finished that sound
+    def __init__(self, manager, name):
+        self.manager = manager
+        self.name = name
+
+    def play(self):
+        self.manager.play(self.name)
+
+    def stop(self):
+        self.manager.stop(self.name)
+
+
+class AssetManager:
+    def __init__(self, sound_dir=SOUND_DIR, sound_files=SOUND_FILES, channel_count=CHANNEL_COUNT,
+                 timer=None):
+        self.sound_dir = sound_dir
+        self.timer = timer  # Optional callback(phase, seconds) for startup timing
+        self.sound_files = dict(sound_files)
+        self.channel_count = channel_count
+        self.enabled = True
+        self.sounds = {}  # name -> decoded pygame.mixer.Sound
+        self.channels = []
+        self.next_channel = 0
+        self.lock = threading.Lock()
+        self.loader = None
+        self.loaded = threading.Event()
+
+    def sound(self, name):
+        return SoundHandle(self, name)
+
+    def record(self, phase, start):
+        if self.timer is not None:
+            self.timer(phase, time.perf_counter() - start)
+
+    def start_loading(self):
+        # Open the mixer, then decode every sound on a daemon thread so frames
+        # are never held up by audio decoding
+        if self.loader is not None or self.loaded.is_set():
+            return
+        start = time.perf_counter()
+        if not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                print("No audio device found. Sounds are disabled.")
+        self.record("mixer", start)
+        if not pygame.mixer.get_init():
+            self.enabled = False
+            self.loaded.set()
+            return
+
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), self.channel_count))
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self.loader = threading.Thread(target=self.load_sounds, name="sound-loader", daemon=True)
+        self.loader.start()
+
+    def load_sounds(self):
+        start = time.perf_counter()
+        missing = []
+        for name, filename in self.sound_files.items():
+            path = os.path.join(self.sound_dir, filename)
+            try:
+                sound = pygame.mixer.Sound(path)
+            except (pygame.error, FileNotFoundError):
+                missing.append(filename)
+                continue
+            with self.lock:
+                self.sounds[name] = sound
+        if missing:
+            print(f"Sound files not found: {', '.join(missing)}. Those sounds stay silent.")
+        self.record("sound decode (background)", start)
+        self.loaded.set()
+
+    def wait_until_loaded(self, timeout=None):
+        return self.loaded.wait(timeout)
+
+    def get_channel(self):
+        # Prefer an idle channel from the pool, otherwise cut off the oldest one
+        for _ in range(len(self.channels)):
+            channel = self.channels[self.next_channel]
+            self.next_channel = (self.next_channel + 1) % len(self.channels)
+            if not channel.get_busy():
+                return channel
+        return self.channels[self.next_channel]
+
+    def play(self, name):
+        if not self.enabled:
+            return
+        if self.loader is None:
+            self.start_loading()  # First use; this sound will be ready next time
+        with self.lock:
+            sound = self.sounds.get(name)
+        if sound is None or not self.channels:
+            return  # Not decoded yet (or missing)
+        self.get_channel().play(sound)
+
+    def stop(self, name):
+        with self.lock:
+            sound = self.sounds.get(name)
+        if sound is not None:
+            sound.stop()
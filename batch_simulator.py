@@ -0,0 +1,157 @@
+import argparse
+import time
+
+import numpy as np
+
+from game_engine import DEFAULT_SNAKES, DEFAULT_LADDERS, LAST_CELL, DICE_FACES
+
+
+def build_jump_table(snakes=None, ladders=None, last_cell=LAST_CELL):
+    # jump[cell] is where a token that lands on cell finally ends up
+    snakes = DEFAULT_SNAKES if snakes is None else snakes
+    ladders = DEFAULT_LADDERS if ladders is None else ladders
+
+    jump = np.arange(last_cell + 1, dtype=np.int32)
+    for start, end in snakes.items():
+        jump[start] = end
+    for start, end in ladders.items():
+        jump[start] = end
+    return jump
+
+
+def build_move_table(jump, last_cell=LAST_CELL):
+    # move[cell, dice] folds the overshoot rule and the jump into one lookup
+    cells = np.arange(last_cell + 1, dtype=np.int32)[:, None]
+    dice = np.arange(DICE_FACES + 1, dtype=np.int32)[None, :]
+    target = cells + dice
+    landed = np.where(target > last_cell, cells, target)
+    moved = jump[np.minimum(landed, last_cell)]
+    # Staying in place (overshoot or zero roll) never triggers a jump
+    return np.where(landed == cells, cells, moved).astype(np.int32)
+
+
+def _finishing_rounds(move, n_games, n_players, rng, last_cell, max_rounds):
+    # Tokens never interact, so each one can be walked on its own; returns
+    # rounds[game, seat], the round in which that token first reaches the last
+    # cell (0 = never, or not needed). Once any token of a game finishes the
+    # game is decided: the others could only finish in a later round, so the
+    # whole game is parked on an extra cell that every roll leaves in place
+    parked = last_cell + 1
+    move = np.vstack([move, np.full((1, move.shape[1]), parked, dtype=move.dtype)])
+    stride = move.shape[1]
+    # Small boards fit every index in int16, which halves memory traffic
+    dtype = np.int16 if move.size <= np.iinfo(np.int16).max else np.int32
+    flat_move = move.ravel().astype(dtype)
+    rounds = np.zeros((n_games, n_players), dtype=np.int32)
+    positions = np.ones((n_games, n_players), dtype=dtype)
+    game_ids = np.arange(n_games, dtype=np.int32)  # Game of each row of positions
+    live = n_games
+
+    for round_index in range(1, max_rounds + 1):
+        if live == 0:
+            break
+        # Parked rows are only dropped once they are a quarter of the array;
+        # copying the rest out every round would cost more than rolling them
+        if live * 4 < positions.shape[0] * 3:
+            playing = positions[:, 0] != parked
+            positions = positions[playing]
+            game_ids = game_ids[playing]
+
+        # Draw one block of dice for every token of every row
+        dice = rng.integers(1, DICE_FACES + 1, size=positions.shape, dtype=dtype)
+        positions *= stride
+        positions += dice
+        positions = flat_move.take(positions)
+
+        # Few tokens finish in any one round, so work from their flat indices
+        finished = np.flatnonzero(positions == last_cell)
+        if finished.size:
+            rows = finished // n_players  # Sorted, with a repeat when two seats finish together
+            rows = rows[np.concatenate(([True], rows[1:] != rows[:-1]))]
+            rounds[game_ids[rows]] = np.where(positions[rows] == last_cell, round_index, 0)
+            positions[rows] = parked
+            live -= rows.size
+
+    return rounds
+
+
+def _simulate_chunk(move, n_games, n_players, rng, last_cell, max_rounds):
+    rounds = _finishing_rounds(move, n_games, n_players, rng, last_cell, max_rounds).astype(np.int64)
+
+    # The first seat (in turn order) to finish in the earliest round wins
+    rounds[rounds == 0] = max_rounds + 1
+    order = rounds * n_players + np.arange(n_players)
+    winners = order.argmin(axis=1).astype(np.int8)
+    lengths = order.min(axis=1) - n_players + 1
+
+    unfinished = rounds.min(axis=1) > max_rounds
+    winners[unfinished] = -1
+    lengths[unfinished] = 0
+    return winners, lengths
+
+
+def simulate(n_games, n_players=2, snakes=None, ladders=None, seed=None,
+             last_cell=LAST_CELL, chunk_size=1_000_000, max_rounds=1000):
+    # Play n_games independent games at once and return their distributions
+    if not 2 <= n_players <= 4:
+        raise ValueError("n_players must be between 2 and 4")
+
+    rng = np.random.default_rng(seed)
+    move = build_move_table(build_jump_table(snakes, ladders, last_cell), last_cell)
+
+    winner_counts = np.zeros(n_players, dtype=np.int64)
+    length_histogram = np.zeros(0, dtype=np.int64)
+    unfinished = 0
+
+    for offset in range(0, n_games, chunk_size):
+        size = min(chunk_size, n_games - offset)
+        winners, lengths = _simulate_chunk(move, size, n_players, rng, last_cell, max_rounds)
+
+        done = winners >= 0
+        unfinished += int(size - done.sum())
+        winner_counts += np.bincount(winners[done], minlength=n_players)
+
+        chunk_histogram = np.bincount(lengths[done])
+        if chunk_histogram.size > length_histogram.size:
+            chunk_histogram[:length_histogram.size] += length_histogram
+            length_histogram = chunk_histogram
+        else:
+            length_histogram[:chunk_histogram.size] += chunk_histogram
+
+    finished = int(winner_counts.sum())
+    turns = np.arange(length_histogram.size)
+    mean_length = float((turns * length_histogram).sum() / finished) if finished else 0.0
+
+    return {
+        "games": n_games,
+        "players": n_players,
+        "unfinished": unfinished,
+        "winner_counts": winner_counts,
+        "win_rates": winner_counts / max(finished, 1),
+        # length_histogram[k] = number of games that ended after k total rolls
+        "length_histogram": length_histogram,
+        "mean_length": mean_length,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of many Snake and Ladders games")
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = simulate(args.games, args.players, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Simulated {args.games} games with {args.players} players in {elapsed:.2f}s")
+    print(f"Mean game length: {result['mean_length']:.2f} rolls")
+    for seat, rate in enumerate(result["win_rates"]):
+        print(f"Seat {seat + 1} win rate: {rate:.4f}")
+    if result["unfinished"]:
+        print(f"Unfinished games: {result['unfinished']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+# Everything runs headless and without audio so results do not depend on a
+# window manager or sound card; set before pygame is first imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import snake_and_ladders as view
+from game_engine import GameEngine, random_layout
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.15  # Relative slowdown that counts as a regression
+BOARD_SIZES = (10, 20, 50, 100)
+SEED = 2024
+FIRST_FRAME_MARKER = "first-frame"
+
+# Metrics where a bigger number is better; every other metric is a time
+HIGHER_IS_BETTER = ("draw_fps.", "turns_per_sec")
+
+
+def best_of(function, repeat, number):
+    # Shortest time per call over repeat rounds of number calls. As in timeit,
+    # the fastest round is the one least disturbed by the rest of the machine,
+    # and the garbage collector is kept out of the timings
+    function()  # Warm caches and lazily created surfaces
+    best = float("inf")
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best / number
+
+
+def seated_game(grid_size=view.GRID_SIZE, players=4, turns=0):
+    # A game in a fixed state: same board, seats and dice on every run
+    if grid_size == view.GRID_SIZE:
+        engine = GameEngine(seed=SEED)
+    else:
+        last_cell = grid_size * grid_size
+        snakes, ladders = random_layout(last_cell, seed=SEED)
+        engine = GameEngine(snakes, ladders, last_cell=last_cell, seed=SEED)
+    game = view.EnhancedSnakeAndLadderGame(engine=engine)
+    for seat in range(players):
+        game.add_player(f"Player {seat + 1}")
+    game.start_game(seed=SEED)
+    for _ in range(turns):
+        if engine.winner is not None:
+            break
+        engine.apply_roll()
+    game.occupancy.rebuild(game.players.positions)
+    return game
+
+
+def prepare_state(state):
+    # Returns (game, per-frame callback) for one of the screens draw() can show
+    if state == "menu":
+        game = view.EnhancedSnakeAndLadderGame()
+        return game, game.draw
+
+    if state == "setup":
+        game = view.EnhancedSnakeAndLadderGame()
+        game.game_state = "setup"
+        game.target_players = 4
+        game.add_player("Ann")
+        game.add_player("Bob")
+        game.input_active = True
+        game.input_text = "Cat"
+        return game, game.draw
+
+    if state == "game":
+        # Worst case: every layer repainted, as after a resize or screen change
+        game = seated_game(turns=24)
+
+        def frame():
+            game.needs_full_redraw = True
+            game.draw()
+        return game, frame
+
+    if state == "game_rolling":
+        # The common animated frame: only the dice panel changes
+        game = seated_game(turns=24)
+        game.dice_rolling = True
+        faces = iter(range(10 ** 9))
+
+        def frame():
+            game.dice_value = next(faces) % 6 + 1
+            game.draw()
+        return game, frame
+
+    if state == "game_over":
+        game = seated_game()
+        game.engine.play_game()
+        game.occupancy.rebuild(game.players.positions)
+        game.game_state = "game_over"
+        return game, game.draw
+
+    raise ValueError(f"unknown state {state!r}")
+
+
+DRAW_STATES = ("menu", "setup", "game", "game_rolling", "game_over")
+
+
+def bench_draw(repeat, frames):
+    results = {}
+    for state in DRAW_STATES:
+        random.seed(SEED)
+        game, frame = prepare_state(state)
+        results[f"draw_fps.{state}"] = 1.0 / best_of(frame, repeat, frames)
+    return results
+
+
+def bench_turns(repeat, games=500):
+    # Rules only: four players playing whole games in the headless engine.
+    # The seeds are fixed, so every round plays exactly the same turns
+    engine = GameEngine(seed=SEED)
+    for seat in range(4):
+        engine.add_player(f"Player {seat + 1}")
+    turns = 0
+    for game in range(games):
+        engine.reset(seed=SEED + game)
+        engine.play_game()
+        turns += engine.turn
+
+    def play():
+        for game in range(games):
+            engine.reset(seed=SEED + game)
+            engine.play_game()
+
+    return {"turns_per_sec": turns / best_of(play, repeat, 1)}
+
+
+def bench_draw_board(repeat, number=10):
+    # Cost of baking the static board into the cached background, which is
+    # what zooming, scrolling or a new layout pays
+    results = {}
+    surface = pygame.Surface((view.SCREEN_WIDTH, view.SCREEN_HEIGHT))
+    for size in BOARD_SIZES:
+        random.seed(SEED)
+        view.text_cache.clear()  # Start each size from the same cache contents
+        game = seated_game(grid_size=size)
+        # Single calls: a board takes long enough to time on its own, and the
+        # quickest call is the steadiest figure on a busy machine
+        results[f"draw_board_ms.{size}x{size}"] = best_of(lambda: game.draw_board(surface),
+                                                          repeat * number, 1) * 1000
+    return results
+
+
+STARTUP_SCRIPT = f"""
+import snake_and_ladders as view
+game = view.EnhancedSnakeAndLadderGame()
+game.draw()
+print({FIRST_FRAME_MARKER!r}, flush=True)
+"""
+
+
+def bench_startup(repeat):
+    # Wall time from launching a fresh interpreter to the first frame drawn
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(__file__)),
+                                                      env.get("PYTHONPATH")]))
+    times = []
+    for _ in range(repeat + 1):
+        start = time.perf_counter()
+        child = subprocess.Popen([sys.executable, "-c", STARTUP_SCRIPT], env=env,
+                                 stdout=subprocess.PIPE, text=True)
+        for line in child.stdout:
+            if line.strip() == FIRST_FRAME_MARKER:
+                break
+        times.append(time.perf_counter() - start)
+        child.kill()
+        child.wait()
+    # The first launch also warms the disk cache and is dropped
+    return {"startup_ms": min(times[1:]) * 1000}
+
+
+SUITES = {
+    "draw": lambda args: bench_draw(args.repeat, args.frames),
+    "turns": lambda args: bench_turns(args.repeat),
+    "board": lambda args: bench_draw_board(args.repeat),
+    "startup": lambda args: bench_startup(args.repeat),
+}
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def higher_is_better(name):
+    return name.startswith(HIGHER_IS_BETTER)
+
+
+def compare(results, baseline, threshold):
+    # [(name, value, baseline value or None, relative change, regressed)];
+    # change is positive when the metric got better
+    rows = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, value, None, 0.0, False))
+            continue
+        change = (value - base) / base if higher_is_better(name) else (base - value) / base
+        rows.append((name, value, base, change, change < -threshold))
+    return rows
+
+
+def format_rows(rows):
+    lines = [f"{'metric':<28}{'value':>12}{'baseline':>12}{'change':>9}"]
+    for name, value, base, change, regressed in rows:
+        base_text = f"{base:12.2f}" if base is not None else f"{'-':>12}"
+        change_text = f"{change:+8.1%}" if base is not None else f"{'':>8}"
+        lines.append(f"{name:<28}{value:12.2f}{base_text} {change_text}"
+                     + ("  REGRESSION" if regressed else ""))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendering and game-logic benchmarks under the SDL dummy driver")
+    parser.add_argument("suites", nargs="*", metavar="SUITE",
+                        help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=7, help="rounds per measurement; the best one counts")
+    parser.add_argument("--frames", type=int, default=200, help="draw() calls per round")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file to compare against")
+    parser.add_argument("--save", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative change flagged as a regression (0.15 = 15%%)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="times a suite with a regression is measured again before it is reported")
+    parser.add_argument("--json", metavar="PATH", help="also write the results to PATH")
+    args = parser.parse_args()
+    unknown = [suite for suite in args.suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+
+    suite_of = {}  # metric -> suite that measures it
+    results = {}
+    for suite in args.suites or SUITES:
+        measured = SUITES[suite](args)
+        suite_of.update(dict.fromkeys(measured, suite))
+        results.update(measured)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        baseline = stored["metrics"]
+        if stored.get("environment") != environment():
+            print(f"Note: {args.baseline} was recorded on {stored.get('environment')}")
+
+    rows = compare(results, baseline, args.threshold)
+    for _ in range(args.retries):
+        # A slowdown only counts if it shows up again: suites with a regressed
+        # metric run once more and each metric keeps its better result
+        rerun = {suite_of[row[0]] for row in rows if row[4]}
+        if not rerun:
+            break
+        for suite in rerun:
+            for name, value in SUITES[suite](args).items():
+                better = max if higher_is_better(name) else min
+                results[name] = better(results[name], value)
+        rows = compare(results, baseline, args.threshold)
+    print(format_rows(rows))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "metrics": results}, f, indent=2)
+    if args.save:
+        # Metrics not run this time keep their old baseline
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), "metrics": {**baseline, **results}}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import bisect
+import functools
+import math
+
+import numpy as np
+
+# World coordinates are measured in cells: x grows to the right from the left
+# edge of the board and y grows downwards from the top edge, so cell 1 sits in
+# the bottom-left corner like on the printed board.
+
+SNAKE_SAMPLES = 21  # Points along each snake's body
+SNAKE_BEND = 5 / 6  # Furthest a body's control point sits from its midpoint, in cells
+WIGGLE_KEYFRAMES = 8  # Poses in one wiggle cycle
+WIGGLE_SWAY = 0.4  # How far the control point swings to either side, in cells
+
+# Quadratic Bezier weights of (head, control point, tail) at each sample
+_T = np.linspace(0.0, 1.0, SNAKE_SAMPLES)
+_BEZIER = np.stack([(1 - _T) ** 2, 2 * (1 - _T) * _T, _T ** 2], axis=1)
+
+
+def cell_to_grid(cell, grid_size):
+    # (column, row from the top) of a cell, following the boustrophedon order
+    row = (cell - 1) // grid_size
+    col = (cell - 1) % grid_size
+
+    # Reverse column order for odd rows to create snake pattern
+    if row % 2 == 1:
+        col = grid_size - 1 - col
+
+    return col, grid_size - 1 - row
+
+
+def grid_to_cell(col, row, grid_size):
+    bottom_row = grid_size - 1 - row
+    if bottom_row % 2 == 1:
+        col = grid_size - 1 - col
+    return bottom_row * grid_size + col + 1
+
+
+def cell_center(cell, grid_size):
+    col, row = cell_to_grid(cell, grid_size)
+    return col + 0.5, row + 0.5
+
+
+class Camera:
+    # Maps world (cell) coordinates into a rectangle on the screen
+    def __init__(self, viewport, grid_size, cell_size, min_cell_size=None, max_cell_size=None):
+        self.viewport = viewport  # (left, top, width, height) in pixels
+        self.grid_size = grid_size
+        fit = min(viewport[2], viewport[3]) / grid_size
+        self.min_cell_size = min_cell_size if min_cell_size is not None else fit
+        self.max_cell_size = max_cell_size if max_cell_size is not None else cell_size
+        self.cell_size = cell_size
+        self.offset_x = 0.0  # World coordinates of the viewport's top-left corner
+        self.offset_y = 0.0
+        self.clamp()
+
+    def state(self):
+        # Anything cached from a camera view is valid for exactly this tuple
+        return (self.cell_size, self.offset_x, self.offset_y)
+
+    def view_size(self):
+        return self.viewport[2] / self.cell_size, self.viewport[3] / self.cell_size
+
+    def clamp(self):
+        self.cell_size = max(self.min_cell_size, min(self.max_cell_size, self.cell_size))
+        view_w, view_h = self.view_size()
+        self.offset_x = max(0.0, min(self.offset_x, self.grid_size - view_w))
+        self.offset_y = max(0.0, min(self.offset_y, self.grid_size - view_h))
+        # Snap to whole pixels so cached layers line up between frames
+        self.offset_x = round(self.offset_x * self.cell_size) / self.cell_size
+        self.offset_y = round(self.offset_y * self.cell_size) / self.cell_size
+
+    def to_screen(self, wx, wy):
+        return (self.viewport[0] + (wx - self.offset_x) * self.cell_size,
+                self.viewport[1] + (wy - self.offset_y) * self.cell_size)
+
+    def to_world(self, sx, sy):
+        return (self.offset_x + (sx - self.viewport[0]) / self.cell_size,
+                self.offset_y + (sy - self.viewport[1]) / self.cell_size)
+
+    def to_screen_array(self, points):
+        # to_screen for an array of world points, last axis (x, y)
+        return (np.asarray(points) - (self.offset_x, self.offset_y)) * self.cell_size + self.viewport[:2]
+
+    def visible_world_rect(self):
+        view_w, view_h = self.view_size()
+        return self.offset_x, self.offset_y, self.offset_x + view_w, self.offset_y + view_h
+
+    def visible_grid_range(self):
+        # Columns and rows (from the top) with at least one visible pixel
+        left, top, right, bottom = self.visible_world_rect()
+        cols = range(max(0, int(left)), min(self.grid_size, math.ceil(right)))
+        rows = range(max(0, int(top)), min(self.grid_size, math.ceil(bottom)))
+        return cols, rows
+
+    def contains(self, wx, wy, margin=0.0):
+        left, top, right, bottom = self.visible_world_rect()
+        return left - margin <= wx <= right + margin and top - margin <= wy <= bottom + margin
+
+    def center_on(self, wx, wy):
+        view_w, view_h = self.view_size()
+        self.offset_x = wx - view_w / 2
+        self.offset_y = wy - view_h / 2
+        self.clamp()
+
+    def pan(self, dx_cells, dy_cells):
+        self.offset_x += dx_cells
+        self.offset_y += dy_cells
+        self.clamp()
+
+    def zoom(self, factor, anchor=None):
+        # Zoom around a screen point (the viewport centre by default)
+        if anchor is None:
+            anchor = (self.viewport[0] + self.viewport[2] / 2, self.viewport[1] + self.viewport[3] / 2)
+        wx, wy = self.to_world(*anchor)
+        self.cell_size *= factor
+        self.cell_size = max(self.min_cell_size, min(self.max_cell_size, self.cell_size))
+        self.offset_x = wx - (anchor[0] - self.viewport[0]) / self.cell_size
+        self.offset_y = wy - (anchor[1] - self.viewport[1]) / self.cell_size
+        self.clamp()
+
+
+class SpatialIndex:
+    # Uniform bucket grid over the board; each entity is stored in every
+    # bucket its bounding box touches so a view query only visits nearby ones
+    def __init__(self, grid_size, bucket_size=8):
+        self.bucket_size = bucket_size
+        self.buckets_per_side = max(1, math.ceil(grid_size / bucket_size))
+        self.buckets = {}
+        self.bounds = {}
+
+    def bucket_range(self, left, top, right, bottom):
+        last = self.buckets_per_side - 1
+        bx0 = min(last, max(0, int(left // self.bucket_size)))
+        by0 = min(last, max(0, int(top // self.bucket_size)))
+        bx1 = min(last, max(0, int(right // self.bucket_size)))
+        by1 = min(last, max(0, int(bottom // self.bucket_size)))
+        return range(bx0, bx1 + 1), range(by0, by1 + 1)
+
+    def insert(self, key, left, top, right, bottom):
+        self.bounds[key] = (left, top, right, bottom)
+        xs, ys = self.bucket_range(left, top, right, bottom)
+        for bx in xs:
+            for by in ys:
+                self.buckets.setdefault((bx, by), []).append(key)
+
+    def query(self, left, top, right, bottom):
+        found = set()
+        xs, ys = self.bucket_range(left, top, right, bottom)
+        for bx in xs:
+            for by in ys:
+                for key in self.buckets.get((bx, by), ()):
+                    if key in found:
+                        continue
+                    k_left, k_top, k_right, k_bottom = self.bounds[key]
+                    if k_left <= right and k_right >= left and k_top <= bottom and k_bottom >= top:
+                        found.add(key)
+        return found
+
+
+def build_jump_index(snakes, ladders, grid_size, margin=1.0):
+    # Index snakes and ladders by the world-space box around both of their ends
+    index = SpatialIndex(grid_size)
+    for kind, jumps in (("snake", snakes), ("ladder", ladders)):
+        for start, end in jumps.items():
+            x0, y0 = cell_center(start, grid_size)
+            x1, y1 = cell_center(end, grid_size)
+            index.insert((kind, start), min(x0, x1) - margin, min(y0, y1) - margin,
+                         max(x0, x1) + margin, max(y0, y1) + margin)
+    return index
+
+
+class SnakePaths:
+    # Every snake's body in world coordinates at each wiggle keyframe. Built
+    # once per board; drawing a pose is then an array lookup and a transform
+    def __init__(self, snakes, grid_size, keyframes=WIGGLE_KEYFRAMES):
+        self.keyframes = keyframes
+        self.rows = {start: row for row, start in enumerate(snakes)}
+        count = len(snakes)
+        ends = np.array([cell_center(cell, grid_size) for start, end in snakes.items() for cell in (start, end)],
+                        dtype=float).reshape(count, 2, 2)
+        heads, tails = ends[:, 0], ends[:, 1]
+
+        # Each snake's bend and wiggle phase come from the board itself, so a
+        # board looks the same every time it is shown, on every machine
+        rng = np.random.default_rng([grid_size] + [cell for jump in sorted(snakes.items()) for cell in jump])
+        bends = rng.uniform(-SNAKE_BEND, SNAKE_BEND, (count, 2))
+        phases = rng.uniform(0.0, 2 * math.pi, count)
+
+        # The control point sways across the body, perpendicular to it
+        along = tails - heads
+        lengths = np.hypot(along[:, 0], along[:, 1])[:, None]
+        across = np.divide(np.stack([-along[:, 1], along[:, 0]], axis=1), lengths,
+                           out=np.zeros_like(along), where=lengths > 0)
+        angles = phases[:, None] + np.arange(keyframes) * (2 * math.pi / keyframes)
+        controls = ((heads + tails) / 2 + bends)[:, None, :] + WIGGLE_SWAY * np.sin(angles)[..., None] * across[:, None, :]
+
+        # points[snake, keyframe, sample] = weighted sum of head, control point and tail
+        shape = controls.shape
+        anchors = np.stack([np.broadcast_to(heads[:, None, :], shape), controls,
+                            np.broadcast_to(tails[:, None, :], shape)], axis=2)
+        self.points = np.einsum("sj,nkjd->nksd", _BEZIER, anchors)
+
+    def bodies(self, starts, keyframe, camera):
+        # Screen points of the given snakes' bodies, shape (snakes, samples, 2)
+        rows = [self.rows[start] for start in starts]
+        return camera.to_screen_array(self.points[rows, keyframe])
+
+    def bounds(self, start):
+        # World box holding the body in every keyframe
+        points = self.points[self.rows[start]].reshape(-1, 2)
+        (left, top), (right, bottom) = points.min(axis=0), points.max(axis=0)
+        return left, top, right, bottom
+
+
+@functools.lru_cache(maxsize=None)
+def stack_offsets(count, token_size):
+    # Pixel offsets from the cell centre for a stack of count tokens. Up to
+    # four fan out diagonally; bigger stacks pack into a square grid that
+    # stays about a cell wide however many tokens it holds
+    if count <= 4:
+        return tuple(((k - count / 2 + 0.5) * token_size * 0.7,
+                      (k - count / 2 + 0.5) * token_size * 0.3) for k in range(count))
+    cols = math.ceil(math.sqrt(count))
+    rows = math.ceil(count / cols)
+    step = min(token_size * 0.7, token_size * 1.2 / (cols - 1))
+    return tuple(((k % cols - (cols - 1) / 2) * step,
+                  (k // cols - (rows - 1) / 2) * step) for k in range(count))
+
+
+class CellOccupancy:
+    # cell -> seats resting on it, updated one move at a time. Each cell's
+    # stack layout is cached until somebody joins or leaves that cell
+    def __init__(self, token_size):
+        self.token_size = token_size
+        self.cells = {}
+        self.layouts = {}
+        self.count = 0
+
+    def rebuild(self, positions):
+        self.cells = {}
+        self.layouts = {}
+        self.count = 0
+        for seat, cell in enumerate(positions):
+            self.add(seat, cell)
+
+    def add(self, seat, cell):
+        bisect.insort(self.cells.setdefault(cell, []), seat)
+        self.layouts.pop(cell, None)
+        self.count += 1
+
+    def remove(self, seat, cell):
+        seats = self.cells[cell]
+        seats.remove(seat)
+        if not seats:
+            del self.cells[cell]
+        self.layouts.pop(cell, None)
+        self.count -= 1
+
+    def layout(self, cell):
+        # [(seat, dx, dy), ...] for the tokens stacked on cell
+        layout = self.layouts.get(cell)
+        if layout is None:
+            seats = self.cells.get(cell, [])
+            offsets = stack_offsets(len(seats), self.token_size)
+            layout = [(seat, dx, dy) for seat, (dx, dy) in zip(seats, offsets)]
+            self.layouts[cell] = layout
+        return layout
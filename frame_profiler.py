@@ -0,0 +1,239 @@
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+from asset_manager import LazyFont
+
+# Methods of the game that are timed, in the order the overlay lists them
+PHASES = ("handle_events", "update", "draw_board", "draw_players", "draw_dice",
+          "draw_player_info", "draw_game_over")
+WINDOW = 600  # Frames kept for the rolling statistics (10 s at 60 FPS)
+OVERLAY_REFRESH_MS = 250
+OVERLAY_BACKGROUND = (0, 0, 0, 170)
+OVERLAY_TEXT = (255, 255, 255)
+
+# "new_surfaces" counts surfaces made by the Surface constructor, these
+# transforms and text renders (through LazyFont, which every text render in
+# the game goes through). Surface methods cannot be wrapped, so copy(),
+# convert() and subsurface copies are not counted
+_TRANSFORMS = ("scale", "smoothscale", "rotate", "rotozoom", "flip")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class FrameProfiler:
+    # Times the game's phases frame by frame. Nothing is wrapped while it is
+    # disabled, so a build with profiling off runs exactly the normal code
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.enabled = False
+        self.visible = False
+        self.game = None
+        self.frames = deque(maxlen=window)  # One dict per frame: phase -> seconds
+        self.current = {}
+        self.frame_start = None
+        self.frame_count = 0
+        self.new_surfaces = 0
+        self.counting = True
+        self.saved = {}  # What was replaced while enabled, to put it back
+        self.overlay = None
+        self.overlay_rect = None
+        self.overlay_time = 0
+        self.under_overlay = None
+        self.font = LazyFont("consolas,dejavusansmono,couriernew", 14)
+        self.export_prefix = "frame_profile"
+
+    def instrument(self, game):
+        self.game = game
+        if self.enabled:
+            self.wrap_game()
+
+    def timed(self, phase, method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.current[phase] = self.current.get(phase, 0.0) + time.perf_counter() - start
+        return wrapper
+
+    def counted(self, function):
+        def wrapper(*args, **kwargs):
+            if self.counting:
+                self.new_surfaces += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    def wrap_game(self):
+        for phase in PHASES:
+            # Instance attributes shadow the class methods until unwrap_game
+            setattr(self.game, phase, self.timed(phase, getattr(type(self.game), phase).__get__(self.game)))
+
+    def unwrap_game(self):
+        for phase in PHASES:
+            self.game.__dict__.pop(phase, None)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        if self.game is not None:
+            self.wrap_game()
+
+        profiler = self
+
+        class CountedSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                if profiler.counting:
+                    profiler.new_surfaces += 1
+                super().__init__(*args, **kwargs)
+
+        self.saved["Surface"] = pygame.Surface
+        pygame.Surface = CountedSurface
+        for name in _TRANSFORMS:
+            self.saved[name] = getattr(pygame.transform, name)
+            setattr(pygame.transform, name, self.counted(self.saved[name]))
+        self.saved["render"] = LazyFont.render
+        LazyFont.render = self.counted(LazyFont.render)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.visible = False
+        if self.game is not None:
+            self.unwrap_game()
+        pygame.Surface = self.saved.pop("Surface")
+        for name in _TRANSFORMS:
+            setattr(pygame.transform, name, self.saved.pop(name))
+        LazyFont.render = self.saved.pop("render")
+
+    def toggle_overlay(self):
+        # The overlay needs data, so showing it also turns profiling on
+        if self.visible:
+            self.visible = False
+            self.hide_overlay()
+        else:
+            self.enable()
+            self.visible = True
+            self.overlay_time = 0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.current = {}
+        self.new_surfaces = 0
+        self.frame_start = time.perf_counter()
+        self.restore_under_overlay()
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        self.current["frame"] = time.perf_counter() - self.frame_start
+        self.current["new_surfaces"] = self.new_surfaces
+        self.frames.append(self.current)
+        self.frame_count += 1
+        self.frame_start = None
+
+    def stats(self):
+        # {phase: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}} over the window
+        result = {}
+        for phase in PHASES + ("frame",):
+            values = sorted(frame[phase] * 1000 for frame in self.frames if phase in frame)
+            result[phase] = {
+                "count": len(values),
+                "mean_ms": sum(values) / len(values) if values else 0.0,
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "p99_ms": percentile(values, 0.99),
+                "max_ms": values[-1] if values else 0.0,
+            }
+        new_surfaces = sorted(frame["new_surfaces"] for frame in self.frames)
+        result["new_surfaces"] = {
+            "count": len(new_surfaces),
+            "mean": sum(new_surfaces) / len(new_surfaces) if new_surfaces else 0.0,
+            "p99": percentile(new_surfaces, 0.99),
+            "max": new_surfaces[-1] if new_surfaces else 0,
+        }
+        return result
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"frames": self.frame_count, "window": len(self.frames),
+                       "stats": self.stats(), "samples": list(self.frames)}, f, indent=2)
+
+    def export_csv(self, path):
+        # One row per frame in the window, times in milliseconds
+        columns = PHASES + ("frame",)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame",) + tuple(f"{phase}_ms" for phase in columns) + ("new_surfaces",))
+            first = self.frame_count - len(self.frames)
+            for index, frame in enumerate(self.frames):
+                writer.writerow([first + index] + [f"{frame.get(phase, 0.0) * 1000:.3f}" for phase in columns]
+                                + [frame["new_surfaces"]])
+
+    def export(self, prefix=None):
+        prefix = prefix or self.export_prefix
+        self.export_csv(prefix + ".csv")
+        self.export_json(prefix + ".json")
+        return prefix + ".csv", prefix + ".json"
+
+    def build_overlay(self):
+        stats = self.stats()
+        lines = [f"{'phase':<17}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for phase in PHASES + ("frame",):
+            phase_stats = stats[phase]
+            if phase_stats["count"]:
+                lines.append(f"{phase:<17}{phase_stats['p50_ms']:7.2f}{phase_stats['p95_ms']:7.2f}"
+                             f"{phase_stats['p99_ms']:7.2f}")
+        new_surfaces = stats["new_surfaces"]
+        lines.append(f"new surfaces/frame  mean {new_surfaces['mean']:.1f}  max {new_surfaces['max']}")
+
+        rendered = [self.font.render(line, True, OVERLAY_TEXT) for line in lines]
+        width = max(text.get_width() for text in rendered) + 16
+        height = sum(text.get_height() for text in rendered) + 12
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill(OVERLAY_BACKGROUND)
+        y = 6
+        for text in rendered:
+            overlay.blit(text, (8, y))
+            y += text.get_height()
+        return overlay
+
+    def draw_overlay(self, surface):
+        # Drawn after the frame and kept out of its numbers. What it covers is
+        # saved so the next frame's dirty rects start from the real picture
+        if not self.visible:
+            return
+        self.counting = False
+        self.restore_under_overlay()
+        old_rect = self.overlay_rect
+        now = pygame.time.get_ticks()
+        if self.overlay is None or now - self.overlay_time >= OVERLAY_REFRESH_MS:
+            self.overlay = self.build_overlay()
+            self.overlay_time = now
+        rect = self.overlay.get_rect(topright=(surface.get_width() - 10, 10))
+        self.under_overlay = surface.subsurface(rect).copy()
+        self.overlay_rect = rect
+        surface.blit(self.overlay, rect)
+        pygame.display.update(rect if old_rect is None else rect.union(old_rect))
+        self.counting = True
+
+    def restore_under_overlay(self):
+        if self.under_overlay is not None:
+            pygame.display.get_surface().blit(self.under_overlay, self.overlay_rect)
+            self.under_overlay = None
+
+    def hide_overlay(self):
+        if self.overlay_rect is not None:
+            self.restore_under_overlay()
+            pygame.display.update(self.overlay_rect)
+            self.overlay_rect = None
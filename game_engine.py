@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import random
+import struct
+import zlib
+from array import array
+
+# Board constants
+LAST_CELL = 100
+DICE_FACES = 6
+
+# Where derived data (analysis results, resolved font paths, ...) is cached
+CACHE_DIR = os.environ.get(
+    "SNAKE_LADDERS_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "snake_and_ladders"),
+)
+
+# Default board layout
+DEFAULT_SNAKES = {
+    16: 6, 47: 26, 49: 11, 65: 53, 62: 19,
+    64: 60, 87: 24, 93: 73, 95: 75, 98: 78
+}
+DEFAULT_LADDERS = {
+    1: 38, 4: 14, 9: 31, 21: 42, 28: 84,
+    36: 44, 51: 67, 71: 91, 80: 100
+}
+
+
+class Move:
+    # Result of applying one dice roll to the current player
+    def __init__(self, player_index, dice_value, start, path, jump):
+        self.player_index = player_index
+        self.dice_value = dice_value
+        self.start = start
+        self.path = path  # Every cell visited, including the snake/ladder target
+        self.jump = jump  # "snake", "ladder" or None
+        self.end = path[-1]
+
+    def __repr__(self):
+        return (f"Move(player={self.player_index}, dice={self.dice_value}, "
+                f"{self.start}->{self.end}, jump={self.jump})")
+
+
+class Player:
+    # Per-player metadata; the position lives in the owning PlayerTable
+    __slots__ = ("table", "index", "name", "color", "token_index")
+
+    def __init__(self, table, index, name, color=None, token_index=None):
+        self.table = table
+        self.index = index
+        self.name = name
+        self.color = color
+        self.token_index = token_index
+
+    @property
+    def position(self):
+        return self.table.positions[self.index]
+
+    @position.setter
+    def position(self, cell):
+        self.table.positions[self.index] = cell
+
+    def __repr__(self):
+        return f"Player({self.index}, {self.name!r}, position={self.position})"
+
+
+class PlayerTable:
+    # Struct-of-arrays player storage: every position sits in one unsigned
+    # 16-bit array (boards up to 65535 cells) and the rarely touched metadata
+    # in Player records, so hundreds of seats stay cheap to scan and compare
+    def __init__(self):
+        self.positions = array("H")
+        self.records = []
+
+    def add(self, name, color=None, token_index=None):
+        player = Player(self, len(self.records), name, color, token_index)
+        self.records.append(player)
+        self.positions.append(1)
+        return player
+
+    def clear(self):
+        del self.positions[:]
+        del self.records[:]
+
+    def reset_positions(self, cell=1):
+        self.positions[:] = array("H", [cell]) * len(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self):
+        return iter(self.records)
+
+
+class GameEngine:
+    # Pure-Python rules of the game, no display or sound involved
+    def __init__(self, snakes=None, ladders=None, last_cell=LAST_CELL, seed=None):
+        self.snakes = dict(DEFAULT_SNAKES if snakes is None else snakes)
+        self.ladders = dict(DEFAULT_LADDERS if ladders is None else ladders)
+        self.last_cell = last_cell
+        # Every match is reproducible from its seed, so one is always chosen
+        self.seed = random.randrange(2 ** 63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.players = PlayerTable()
+        self.current_player = 0
+        self.winner = None
+        self.turn = 0
+
+    def add_player(self, name, color=None, token_index=None):
+        return self.players.add(name, color, token_index)
+
+    def reset(self, seed=None):
+        # A new seed restarts the dice sequence for the next match
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+        self.players.reset_positions()
+        self.current_player = 0
+        self.winner = None
+        self.turn = 0
+
+    def roll(self):
+        return self.rng.randint(1, DICE_FACES)
+
+    def plan_move(self, dice_value):
+        # Work out where the current player ends up without changing any state
+        start = self.players.positions[self.current_player]
+        new_position = start + dice_value
+
+        if new_position > self.last_cell:
+            new_position = start  # Can't move beyond the last cell
+
+        path = list(range(start, new_position + 1))
+
+        # Check for snakes and ladders at the end position
+        jump = None
+        if new_position != start:
+            if new_position in self.snakes:
+                path.append(self.snakes[new_position])
+                jump = "snake"
+            elif new_position in self.ladders:
+                path.append(self.ladders[new_position])
+                jump = "ladder"
+
+        return Move(self.current_player, dice_value, start, path, jump)
+
+    def commit_move(self, move):
+        # Apply a planned move, detect the winner and pass the turn on
+        self.players.positions[move.player_index] = move.end
+        self.turn += 1
+        if move.end == self.last_cell:
+            self.winner = move.player_index
+        else:
+            self.next_player_turn()
+        return move
+
+    def apply_roll(self, dice_value=None):
+        if dice_value is None:
+            dice_value = self.roll()
+        return self.commit_move(self.plan_move(dice_value))
+
+    def next_player_turn(self):
+        self.current_player = (self.current_player + 1) % len(self.players)
+
+    def state_hash(self):
+        # Cheap fingerprint of everything the next move depends on; peers
+        # compare it to notice when their games have drifted apart
+        header = struct.pack("<IIi", self.turn, self.current_player,
+                             -1 if self.winner is None else self.winner)
+        return zlib.crc32(self.players.positions.tobytes(), zlib.crc32(header))
+
+    def play_game(self, max_turns=10000):
+        # Play until somebody wins and return the winner's index
+        while self.winner is None and self.turn < max_turns:
+            self.apply_roll()
+        return self.winner
+
+
+def random_layout(last_cell=LAST_CELL, n_snakes=None, n_ladders=None, seed=None):
+    # Random snakes and ladders for boards of any size; by default they are as
+    # dense as on the classic 10x10 board
+    rng = random.Random(seed)
+    if n_snakes is None:
+        n_snakes = max(1, round(len(DEFAULT_SNAKES) * last_cell / LAST_CELL))
+    if n_ladders is None:
+        n_ladders = max(1, round(len(DEFAULT_LADDERS) * last_cell / LAST_CELL))
+    max_jump = max(10, int(last_cell ** 0.5) * 4)
+
+    used = {1, last_cell}
+    snakes = {}
+    ladders = {}
+    for jumps, count, direction in ((snakes, n_snakes, -1), (ladders, n_ladders, 1)):
+        attempts = 0
+        while len(jumps) < count and attempts < count * 50:
+            attempts += 1
+            start = rng.randint(2, last_cell - 1)
+            end = start + direction * rng.randint(1, max_jump)
+            # Ends must be on the board and no cell may take part in two jumps
+            if start in used or end in used or not 1 <= end <= last_cell:
+                continue
+            jumps[start] = end
+            used.update((start, end))
+    return snakes, ladders
+
+
+def board_hash(snakes=None, ladders=None, last_cell=LAST_CELL):
+    # Stable key for a board layout, used to cache anything derived from it
+    snakes = DEFAULT_SNAKES if snakes is None else snakes
+    ladders = DEFAULT_LADDERS if ladders is None else ladders
+    layout = json.dumps({
+        "last_cell": last_cell,
+        "snakes": sorted((int(k), int(v)) for k, v in snakes.items()),
+        "ladders": sorted((int(k), int(v)) for k, v in ladders.items()),
+    })
+    return hashlib.sha256(layout.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,181 @@
+import argparse
+import json
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from game_engine import LAST_CELL, DEFAULT_SNAKES, DEFAULT_LADDERS, board_hash, random_layout
+from markov_analysis import transition_matrix, seat_win_probabilities, TAIL_EPSILON, MAX_TURNS
+
+# A candidate whose expected length is already this far over the target while
+# its distribution is still being built is given up on
+DEFAULT_CUTOFF = 0.5
+
+
+def evaluate_layout(snakes, ladders, n_players=2, last_cell=LAST_CELL, cutoff_length=None):
+    # Exact game-length statistics of a layout; None if it was cut off early
+    matrix = transition_matrix(snakes, ladders, last_cell)
+    state = np.zeros(last_cell + 1)
+    state[1] = 1.0
+
+    finished = [0.0]
+    expected_rounds = 0.0
+    for _ in range(MAX_TURNS):
+        survival = 1.0 - finished[-1]
+        if survival < TAIL_EPSILON:
+            break
+        # P(nobody has finished after k rounds) adds up to the expected rounds
+        expected_rounds += survival ** n_players
+        if cutoff_length is not None and expected_rounds > cutoff_length:
+            return None
+        state = state @ matrix
+        finished.append(state[last_cell])
+
+    distribution = np.diff(np.array(finished), prepend=0.0)
+    # E[R^2] = sum over k of (2k + 1) * P(nobody has finished after k rounds)
+    nobody_done = np.clip(1.0 - np.cumsum(distribution), 0.0, 1.0) ** n_players
+    rounds = np.arange(len(distribution))
+    second_moment = float(((2 * rounds + 1) * nobody_done).sum())
+    wins = seat_win_probabilities(distribution, n_players)
+
+    return {
+        "mean_rounds": float(expected_rounds),
+        "std_rounds": float(max(0.0, second_moment - expected_rounds ** 2) ** 0.5),
+        "win_rates": [float(w) for w in wins],
+        "fairness_gap": float(wins.max() - wins.min()),
+    }
+
+
+def score_metrics(metrics, target_length, target_std, fairness_weight=1.0):
+    # Lower is better; 0 means the layout hits every target exactly
+    if metrics is None:
+        return float("inf")
+    length_error = (metrics["mean_rounds"] - target_length) / target_length
+    std_error = (metrics["std_rounds"] - target_std) / target_std if target_std else 0.0
+    return length_error ** 2 + std_error ** 2 + fairness_weight * metrics["fairness_gap"] ** 2 * 100
+
+
+def _evaluate_task(task):
+    key, snakes, ladders, n_players, last_cell, cutoff_length = task
+    return key, evaluate_layout(snakes, ladders, n_players, last_cell, cutoff_length)
+
+
+def mutate(snakes, ladders, last_cell, rng):
+    # Move one end of one snake or ladder to a nearby free cell
+    snakes = dict(snakes)
+    ladders = dict(ladders)
+    jumps, direction = (snakes, -1) if (rng.random() < 0.5 and snakes) or not ladders else (ladders, 1)
+    start = rng.choice(list(jumps))
+    end = jumps.pop(start)
+    used = {1, last_cell} | set(snakes) | set(snakes.values()) | set(ladders) | set(ladders.values())
+
+    for _ in range(50):
+        spread = max(3, last_cell // 20)
+        if rng.random() < 0.5:
+            new_start, new_end = start + rng.randint(-spread, spread), end
+        else:
+            new_start, new_end = start, end + rng.randint(-spread, spread)
+        if (2 <= new_start < last_cell and 1 <= new_end <= last_cell
+                and (new_end - new_start) * direction > 0
+                and new_start not in used and new_end not in used):
+            jumps[new_start] = new_end
+            return snakes, ladders
+
+    jumps[start] = end  # Nowhere to move it; keep the layout as it was
+    return snakes, ladders
+
+
+def search(target_length, target_std, n_players=2, last_cell=LAST_CELL, generations=20,
+           population=200, survivors=20, workers=None, seed=None, fairness_weight=1.0,
+           cutoff=DEFAULT_CUTOFF, progress=None):
+    rng = random.Random(seed)
+    cache = {}  # board_hash -> metrics (None when cut off)
+    cutoff_length = target_length * (1 + cutoff) if cutoff is not None else None
+
+    candidates = [random_layout(last_cell, seed=rng.random()) for _ in range(population)]
+    if last_cell == LAST_CELL:
+        candidates[0] = (dict(DEFAULT_SNAKES), dict(DEFAULT_LADDERS))
+
+    best = []
+    evaluated = 0
+    with multiprocessing.Pool(workers) as pool:
+        for generation in range(generations):
+            # Only layouts that have never been scored go to the workers
+            keyed = {}
+            for snakes, ladders in candidates:
+                keyed.setdefault(board_hash(snakes, ladders, last_cell), (snakes, ladders))
+            tasks = [(key, snakes, ladders, n_players, last_cell, cutoff_length)
+                     for key, (snakes, ladders) in keyed.items() if key not in cache]
+            for key, metrics in pool.imap_unordered(_evaluate_task, tasks, chunksize=8):
+                cache[key] = metrics
+            evaluated += len(tasks)
+
+            # Keep the best layouts seen so far across all generations
+            merged = {key: (score, key, layout) for score, key, layout in best}
+            for key, layout in keyed.items():
+                merged[key] = (score_metrics(cache[key], target_length, target_std, fairness_weight),
+                               key, layout)
+            best = sorted(merged.values(), key=lambda item: item[0])[:survivors]
+
+            if progress is not None:
+                progress(generation, best[0], evaluated)
+
+            # Next generation: mutations of the survivors plus a few fresh layouts
+            candidates = []
+            for _ in range(population - population // 10):
+                _, _, (snakes, ladders) = rng.choice(best)
+                candidates.append(mutate(snakes, ladders, last_cell, rng))
+            while len(candidates) < population:
+                candidates.append(random_layout(last_cell, seed=rng.random()))
+
+    score, key, (snakes, ladders) = best[0]
+    return {
+        "score": score,
+        "snakes": dict(sorted(snakes.items())),
+        "ladders": dict(sorted(ladders.items())),
+        "metrics": cache[key],
+        "evaluated": evaluated,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search for snake and ladder layouts with a target game-length profile")
+    parser.add_argument("--target-length", type=float, required=True, help="expected rounds per game")
+    parser.add_argument("--target-std", type=float, default=0.0, help="standard deviation of rounds (0 = ignore)")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--grid-size", type=int, default=10)
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--fairness-weight", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="write the best layout to this JSON file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(generation, best, evaluated):
+        score, _, _ = best
+        elapsed = time.perf_counter() - start
+        print(f"Generation {generation + 1}: best score {score:.5f}, "
+              f"{evaluated} layouts scored ({evaluated / elapsed * 60:.0f}/min)")
+
+    result = search(args.target_length, args.target_std, args.players, args.grid_size ** 2,
+                    args.generations, args.population, workers=args.workers, seed=args.seed,
+                    fairness_weight=args.fairness_weight, progress=progress)
+
+    metrics = result["metrics"]
+    print(f"Mean rounds: {metrics['mean_rounds']:.2f}, std: {metrics['std_rounds']:.2f}, "
+          f"win rates: {', '.join(f'{w:.3f}' for w in metrics['win_rates'])}")
+    print(f"snakes = {result['snakes']}")
+    print(f"ladders = {result['ladders']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import random
+import socket
+import struct
+import threading
+
+from serialization import pack_names, unpack_names
+
+# Lockstep online play. Every peer runs the full game locally from a shared
+# seed; the network only carries who rolled what and confirmations that each
+# peer reached the same state afterwards. Frames are a 2-byte length followed
+# by a 1-byte type and a fixed payload:
+#   J  join     room u32, seats u8, name        client -> relay
+#   S  start    seed u64, your seat u8, names   relay -> client
+#   R  roll     seat u8, turn u32, dice u8, state hash before the roll u32
+#   A  ack      seat u8, turn u32, state hash after the move u32
+#   L  left     seat u8                         relay -> client
+# A roll costs 13 bytes on the wire and each acknowledgement 12.
+DEFAULT_PORT = 8766
+
+_LENGTH = struct.Struct("<H")
+_JOIN = struct.Struct("<cIB")
+_START = struct.Struct("<cQBB")
+_ROLL = struct.Struct("<cBIBI")
+_ACK = struct.Struct("<cBII")
+_LEFT = struct.Struct("<cB")
+
+
+def frame(payload):
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class Room:
+    __slots__ = ("room_id", "seats", "peers", "names", "started")
+
+    def __init__(self, room_id, seats):
+        self.room_id = room_id
+        self.seats = seats
+        self.peers = []  # writers, in seat order
+        self.names = []
+        self.started = False  # Seats are handed out; from now on they never change
+
+
+class Relay:
+    # Loopback stand-in for the real relay: seats peers in join order, hands
+    # out the seed once the room is full and forwards everything else as is
+    def __init__(self):
+        self.rooms = {}
+
+    async def handle_connection(self, reader, writer):
+        room = None
+        try:
+            (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+            payload = await reader.readexactly(length)
+            kind, room_id, seats = _JOIN.unpack_from(payload)
+            if kind != b"J" or not 1 <= seats <= 255:
+                return
+            names, _ = unpack_names(payload, 1, _JOIN.size)  # Before taking a seat
+            room = self.rooms.get(room_id)
+            if room is None or room.started:
+                room = self.rooms[room_id] = Room(room_id, seats)
+            room.peers.append(writer)
+            room.names.extend(names)
+            if len(room.peers) == room.seats:
+                room.started = True
+                seed = random.randrange(2 ** 63)
+                names = pack_names(room.names)
+                for seat, peer in enumerate(room.peers):
+                    peer.write(frame(_START.pack(b"S", seed, seat, room.seats) + names))
+
+            while True:
+                (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+                data = frame(await reader.readexactly(length))
+                for peer in room.peers:
+                    if peer is not writer and not peer.is_closing():
+                        peer.write(data)
+        except (ConnectionError, asyncio.IncompleteReadError, struct.error, ValueError):
+            pass  # Malformed frames (a join without a name, say) drop the connection
+        finally:
+            if room is not None and writer in room.peers:
+                seat = room.peers.index(writer)
+                if not room.started:
+                    # Nobody has a seat number yet, so the seat is simply freed
+                    del room.peers[seat]
+                    del room.names[seat]
+                    if not room.peers and self.rooms.get(room.room_id) is room:
+                        del self.rooms[room.room_id]
+                else:
+                    for peer in room.peers:
+                        if peer is not writer and not peer.is_closing():
+                            peer.write(frame(_LEFT.pack(b"L", seat)))
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+def run_relay(host="127.0.0.1", port=DEFAULT_PORT, ready=None):
+    try:
+        asyncio.run(Relay().serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+class LockstepSession:
+    # One peer's connection. A reader thread records incoming rolls and
+    # acknowledgements; the game loop asks it what it may do next, so the
+    # frame loop never blocks on the network
+    def __init__(self, host, port, room, seats, name, notify=None):
+        self.notify = notify  # Called from the reader thread when something arrives
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.started = threading.Event()
+        self.seat = None
+        self.seed = None
+        self.names = []
+        self.rolls = {}  # turn -> (seat, dice, hash before)
+        self.acks = {}  # turn -> {seat: hash after}
+        self.local_hashes = {}  # turn -> our hash after that turn
+        self.left = set()
+        self.desync = None  # Description of the first mismatch seen
+        self.closed = False
+        self.send(_JOIN.pack(b"J", room, seats) + pack_names([name]))
+        self.reader = threading.Thread(target=self.receive, name="lockstep-reader", daemon=True)
+        self.reader.start()
+
+    def send(self, payload):
+        with self.send_lock:
+            self.sock.sendall(frame(payload))
+
+    def read_exactly(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("relay closed the connection")
+            data += chunk
+        return data
+
+    def receive(self):
+        try:
+            while True:
+                (length,) = _LENGTH.unpack(self.read_exactly(_LENGTH.size))
+                self.handle(self.read_exactly(length))
+                if self.notify is not None:
+                    self.notify()
+        except (OSError, struct.error, ValueError):
+            with self.lock:
+                self.closed = True
+            if self.notify is not None:
+                self.notify()
+
+    def handle(self, payload):
+        kind = payload[:1]
+        with self.lock:
+            if kind == b"S":
+                _, self.seed, self.seat, count = _START.unpack_from(payload)
+                self.names, _ = unpack_names(payload, count, _START.size)
+                self.started.set()
+            elif kind == b"R":
+                _, seat, turn, dice, state_hash = _ROLL.unpack(payload)
+                self.rolls[turn] = (seat, dice, state_hash)
+            elif kind == b"A":
+                _, seat, turn, state_hash = _ACK.unpack(payload)
+                self.acks.setdefault(turn, {})[seat] = state_hash
+                self.check(turn)
+            elif kind == b"L":
+                _, seat = _LEFT.unpack(payload)
+                self.left.add(seat)
+
+    def check(self, turn):
+        # Compare every acknowledgement for turn against our own state
+        local = self.local_hashes.get(turn)
+        if local is None or self.desync is not None:
+            return
+        for seat, state_hash in self.acks.get(turn, {}).items():
+            if state_hash != local:
+                self.desync = f"{self.names[seat]} disagrees after turn {turn}"
+
+    def wait_for_start(self, timeout=None):
+        return self.started.wait(timeout)
+
+    def send_roll(self, turn, dice, state_hash):
+        self.send(_ROLL.pack(b"R", self.seat, turn, dice, state_hash))
+
+    def send_ack(self, turn, state_hash):
+        with self.lock:
+            self.local_hashes[turn] = state_hash
+            self.acks.setdefault(turn, {})[self.seat] = state_hash
+            self.check(turn)
+        self.send(_ACK.pack(b"A", self.seat, turn, state_hash))
+
+    def take_roll(self, turn, state_hash):
+        # Dice another peer rolled for turn, or None if it has not arrived
+        with self.lock:
+            roll = self.rolls.pop(turn, None)
+            if roll is None:
+                return None
+            seat, dice, remote_hash = roll
+            if remote_hash != state_hash and self.desync is None:
+                self.desync = f"{self.names[seat]} rolled from a different state at turn {turn}"
+            return dice
+
+    def report_desync(self, reason):
+        with self.lock:
+            if self.desync is None:
+                self.desync = reason
+
+    def departed(self):
+        # Seats whose peers have left. The relay forwards a seat's last roll
+        # before announcing that it left, so every peer sees the same turns
+        with self.lock:
+            return frozenset(self.left)
+
+    def waiting_for(self, turn):
+        # Seats that have not confirmed turn yet (nobody before the first roll)
+        if turn == 0:
+            return []
+        with self.lock:
+            acked = self.acks.get(turn, {})
+            return [seat for seat in range(len(self.names))
+                    if seat not in acked and seat not in self.left]
+
+    def can_roll(self, current_player, turn):
+        return (self.desync is None and not self.closed and current_player == self.seat
+                and not self.waiting_for(turn))
+
+    def close(self):
+        try:
+            # Shut down first: a plain close waits for the reader thread's
+            # recv, so the relay would not hear that we left
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already disconnected
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback relay for lockstep online play")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    print(f"Relaying lockstep games on {args.host}:{args.port}")
+    run_relay(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import argparse
+import io
+import os
+import threading
+
+import numpy as np
+
+from game_engine import DEFAULT_SNAKES, DEFAULT_LADDERS, LAST_CELL, DICE_FACES, CACHE_DIR, board_hash
+from batch_simulator import build_jump_table, build_move_table
+from serialization import atomic_write
+
+# Bump when the stored result format changes so stale cache files are ignored
+CACHE_VERSION = 1
+
+# Stop the turn distribution once this much probability mass is left
+TAIL_EPSILON = 1e-12
+MAX_TURNS = 100000
+
+# First-passage tables stop once a token on any cell it can rest on has this
+# little probability left of still playing (plenty for odds shown in whole
+# percent). A table needs one column per roll that takes, so its size depends
+# on the layout rather than just the board size: the classic board needs a
+# few hundred columns, random 30x30 layouts 3,000-10,000 and random 50x50
+# ones 2,500-70,000. Tables over this many entries (32 MB) are not kept,
+# which leaves some 30x30 and nearly all larger random boards without odds
+PASSAGE_TAIL = 1e-4
+MAX_PASSAGE_ENTRIES = 8_000_000
+PASSAGE_PENDING = object()  # passage_table(wait=False) while the table is being built
+
+_memory_cache = {}
+_passage_builds = {}  # Key -> thread building that first-passage table
+
+
+def transition_matrix(snakes=None, ladders=None, last_cell=LAST_CELL):
+    # P[a, b] = probability that one roll takes a token resting on a to b
+    move = build_move_table(build_jump_table(snakes, ladders, last_cell), last_cell)
+    size = last_cell + 1
+    matrix = np.zeros((size, size))
+    for dice in range(1, DICE_FACES + 1):
+        np.add.at(matrix, (np.arange(size), move[:, dice]), 1.0 / DICE_FACES)
+    return matrix
+
+
+def expected_turns(matrix, last_cell=LAST_CELL):
+    # Fundamental matrix over the transient cells 1..last_cell-1
+    q = matrix[1:last_cell, 1:last_cell]
+    steps = np.linalg.solve(np.eye(last_cell - 1) - q, np.ones(last_cell - 1))
+    expected = np.zeros(last_cell + 1)
+    expected[1:last_cell] = steps
+    return expected
+
+
+def turn_distribution(matrix, last_cell=LAST_CELL, start=1):
+    # distribution[k] = probability that a token starting on start finishes on roll k
+    state = np.zeros(last_cell + 1)
+    state[start] = 1.0
+    finished = [state[last_cell]]
+    for _ in range(MAX_TURNS):
+        if 1.0 - finished[-1] < TAIL_EPSILON:
+            break
+        state = state @ matrix
+        finished.append(state[last_cell])
+    return np.diff(np.array(finished), prepend=0.0)
+
+
+def hit_probabilities(snakes=None, ladders=None, last_cell=LAST_CELL, start=1):
+    # Probability that a token ever lands on each cell (snake heads and ladder
+    # feet included) before the game ends
+    move = build_move_table(build_jump_table(snakes, ladders, last_cell), last_cell)
+    size = last_cell + 1
+    cells = np.arange(size)
+
+    # landing[a, c] = probability that one roll from a lands on c before any jump
+    landing = np.zeros((size, size))
+    for dice in range(1, DICE_FACES + 1):
+        target = cells + dice
+        target = np.where(target > last_cell, cells, target)
+        np.add.at(landing, (cells, target), 1.0 / DICE_FACES)
+    np.fill_diagonal(landing, 0.0)  # Staying put is not a landing
+
+    resting = transition_matrix(snakes, ladders, last_cell)
+    transient = slice(1, last_cell)
+    hits = np.zeros(size)
+    for cell in range(2, size):
+        # Resting transitions that do not go through a landing on cell
+        avoid = resting.copy()
+        for dice in range(1, DICE_FACES + 1):
+            sources = cells[(cells + dice == cell)]
+            avoid[sources, move[sources, dice]] -= 1.0 / DICE_FACES
+        q = avoid[transient, transient]
+        b = landing[transient, cell]
+        solved = np.linalg.solve(np.eye(last_cell - 1) - q, b)
+        hits[cell] = solved[start - 1]
+    hits[start] = 1.0
+    hits[last_cell] = 1.0  # Every game ends on the last cell
+    return hits
+
+
+def seat_win_probabilities(distribution, n_players):
+    # Exact chance of each seat winning when every player follows distribution
+    # and seats roll in order within a round
+    done_by = np.cumsum(distribution)
+    not_done_before = 1.0 - np.concatenate(([0.0], done_by[:-1]))
+    not_done_after = 1.0 - done_by
+    wins = []
+    for seat in range(n_players):
+        earlier = not_done_after ** seat
+        later = not_done_before ** (n_players - seat - 1)
+        wins.append(float((distribution * earlier * later).sum()))
+    return np.array(wins)
+
+
+def first_passage_table(snakes=None, ladders=None, last_cell=LAST_CELL):
+    # finished[c, k] = probability that a token resting on c reaches the last
+    # cell within k rolls, or None if the board is too big to tabulate. Built
+    # backwards: within k rolls from c means within k - 1 from where one roll lands
+    jump = build_jump_table(snakes, ladders, last_cell)
+    move = build_move_table(jump, last_cell)[:, 1:]
+    # Tokens rest on the start and on every cell that is not a snake's head
+    # or a ladder's foot; the cells they jump away from never hold one
+    resting = jump == np.arange(last_cell + 1)
+    resting[0] = False
+    resting[1] = True
+    column = np.zeros(last_cell + 1)
+    column[last_cell] = 1.0
+    columns = [column]
+    max_columns = MAX_PASSAGE_ENTRIES // (last_cell + 1)
+    while column[resting].min() < 1.0 - PASSAGE_TAIL:
+        if len(columns) >= max_columns:
+            return None
+        column = column[move].mean(axis=1)
+        columns.append(column)
+    return np.stack(columns, axis=1).astype(np.float32)
+
+
+def passage_table(snakes=None, ladders=None, last_cell=LAST_CELL, wait=True):
+    # first_passage_table, built once per layout and kept in memory. With
+    # wait=False a missing table is built on a background thread and
+    # PASSAGE_PENDING is returned until it is done, so a frame never waits
+    # for a big board (about half a second for 50x50)
+    snakes = DEFAULT_SNAKES if snakes is None else snakes
+    ladders = DEFAULT_LADDERS if ladders is None else ladders
+    key = ("passage", board_hash(snakes, ladders, last_cell))
+    if key in _memory_cache:
+        return _memory_cache[key]
+    build = _passage_builds.get(key)
+    if build is None:
+        if wait:
+            _memory_cache[key] = first_passage_table(snakes, ladders, last_cell)
+            return _memory_cache[key]
+        build = threading.Thread(target=_build_passage_table, args=(key, dict(snakes), dict(ladders), last_cell),
+                                 name="passage-table", daemon=True)
+        _passage_builds[key] = build
+        build.start()
+    if wait:
+        build.join()
+        return _memory_cache.get(key)
+    return PASSAGE_PENDING
+
+
+def _build_passage_table(key, snakes, ladders, last_cell):
+    _memory_cache[key] = first_passage_table(snakes, ladders, last_cell)
+
+
+def win_probabilities(table, positions, current_player):
+    # Chance of each seat winning from positions with current_player about to
+    # roll. One table row per player; seats earlier in the rolling order must
+    # not have finished by the same round, later seats by the round before
+    count = len(positions)
+    order = (np.arange(count) + current_player) % count
+    finished = table[np.asarray(positions)[order]].astype(float)
+    finishes_on = np.diff(finished, axis=1)  # Column r - 1 is roll r
+    unfinished = 1.0 - finished
+    ones = np.ones((1, unfinished.shape[1]))
+    before = np.cumprod(np.vstack([ones, unfinished[:-1]]), axis=0)
+    after = np.cumprod(np.vstack([ones, unfinished[:0:-1]]), axis=0)[::-1]
+    wins = (finishes_on * before[:, 1:] * after[:, :-1]).sum(axis=1)
+
+    # The table's cut-off tail is shared out in proportion
+    result = np.empty(count)
+    result[order] = wins / wins.sum()
+    return result
+
+
+def _solve(snakes, ladders, last_cell):
+    matrix = transition_matrix(snakes, ladders, last_cell)
+    expected = expected_turns(matrix, last_cell)
+    return {
+        "expected_turns": float(expected[1]),
+        "expected_turns_from": expected,
+        "turn_distribution": turn_distribution(matrix, last_cell),
+        "hit_probabilities": hit_probabilities(snakes, ladders, last_cell),
+    }
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"markov-v{CACHE_VERSION}-{key}.npz")
+
+
+def analyse_board(snakes=None, ladders=None, last_cell=LAST_CELL, use_cache=True):
+    # Exact solution for a board, memoized in memory and on disk by layout hash
+    snakes = DEFAULT_SNAKES if snakes is None else snakes
+    ladders = DEFAULT_LADDERS if ladders is None else ladders
+    key = board_hash(snakes, ladders, last_cell)
+
+    if use_cache and key in _memory_cache:
+        return _memory_cache[key]
+
+    path = _cache_path(key)
+    if use_cache and os.path.exists(path):
+        try:
+            with np.load(path) as data:
+                result = {name: data[name] for name in data.files}
+            result["expected_turns"] = float(result["expected_turns"])
+            _memory_cache[key] = result
+            return result
+        except (OSError, ValueError, KeyError):
+            pass  # Unreadable cache file, solve again and overwrite it
+
+    result = _solve(snakes, ladders, last_cell)
+
+    if use_cache:
+        _memory_cache[key] = result
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            data = io.BytesIO()
+            np.savez(data, **result)
+            atomic_write(path, data.getvalue())
+        except OSError:
+            pass  # The cache is an optimisation; a read-only home is fine
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact Markov-chain analysis of the Snake and Ladders board")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    result = analyse_board(use_cache=not args.no_cache)
+    distribution = result["turn_distribution"]
+    cumulative = np.cumsum(distribution)
+
+    print(f"Expected turns for one player: {result['expected_turns']:.4f}")
+    print(f"Most likely finishing turn: {int(distribution.argmax())}")
+    print(f"Median finishing turn: {int(np.searchsorted(cumulative, 0.5))}")
+    for seat, rate in enumerate(seat_win_probabilities(distribution, args.players)):
+        print(f"Seat {seat + 1} win probability: {rate:.4f}")
+
+    hits = result["hit_probabilities"]
+    top = np.argsort(hits[2:LAST_CELL])[::-1][:5] + 2
+    print("Most visited cells: " + ", ".join(f"{cell} ({hits[cell]:.3f})" for cell in top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import socket
+import time
+
+import numpy as np
+
+from match_server import DEFAULT_PORT, run_server
+
+
+class ServerError(Exception):
+    pass
+
+
+class MatchClient:
+    # One TCP connection to a match server. Requests are pipelined: each one
+    # gets a sequence number and waits for the reply carrying it back
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.seq = itertools.count(1)
+        self.waiting = {}  # seq -> future
+        self.on_delta = None  # Optional callback for deltas other clients caused
+        self.receiver = asyncio.ensure_future(self.receive())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 16)
+        return cls(reader, writer)
+
+    async def receive(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                future = self.waiting.pop(message.get("seq"), None)
+                if future is not None:
+                    future.set_result(message)
+                elif message.get("type") == "delta" and self.on_delta is not None:
+                    self.on_delta(message)
+        finally:
+            error = ConnectionError("connection closed")
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.waiting.clear()
+
+    async def request(self, **request):
+        seq = next(self.seq)
+        request["seq"] = seq
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[seq] = future
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        reply = await future
+        if reply.get("type") == "error":
+            raise ServerError(reply["error"])
+        return reply
+
+    async def create(self, players):
+        return (await self.request(op="create", players=list(players)))["match"]
+
+    async def join(self, match_id):
+        return await self.request(op="join", match=match_id)
+
+    async def roll(self, match_id):
+        return await self.request(op="roll", match=match_id)
+
+    async def leave(self, match_id):
+        return await self.request(op="leave", match=match_id)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
+
+
+async def play_matches(client, n_players, deadline, latencies, finished, think_time=0.0):
+    # Keep one match going on client until deadline, starting a new one
+    # whenever the last one ends; think_time is the pause before each roll
+    names = [f"P{seat + 1}" for seat in range(n_players)]
+    match_id = await client.create(names)
+    while time.perf_counter() < deadline:
+        if think_time:
+            await asyncio.sleep(think_time)
+        start = time.perf_counter()
+        delta = await client.roll(match_id)
+        latencies.append(time.perf_counter() - start)
+        if delta["winner"] is not None:
+            finished.append(delta["turn"])
+            match_id = await client.create(names)
+    await client.leave(match_id)  # The server keeps unfinished matches until they are left
+
+
+async def run_load(host, port, matches, connections, duration, n_players=2, think_time=1.0, ramp_up=2.0):
+    # Drive matches games spread over connections and collect roll-to-delta latencies
+    clients = [await MatchClient.connect(host, port) for _ in range(connections)]
+    latencies = []
+    finished = []
+    deadline = time.perf_counter() + ramp_up + duration
+
+    async def staggered(index):
+        # Spread match starts over the ramp-up so they do not all roll in lockstep
+        await asyncio.sleep(ramp_up * index / matches)
+        await play_matches(clients[index % connections], n_players, deadline, latencies, finished,
+                           think_time)
+
+    tasks = [asyncio.ensure_future(staggered(i)) for i in range(matches)]
+    await asyncio.sleep(ramp_up)
+    measured_from = len(latencies)
+    measure_start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - measure_start
+    for client in clients:
+        await client.close()
+
+    sample = np.array(latencies[measured_from:]) * 1000
+    return {
+        "matches": matches,
+        "connections": connections,
+        "rolls": len(sample),
+        "rolls_per_second": len(sample) / elapsed,
+        "games_finished": len(finished),
+        "p50_ms": float(np.percentile(sample, 50)) if len(sample) else None,
+        "p99_ms": float(np.percentile(sample, 99)) if len(sample) else None,
+        "max_ms": float(sample.max()) if len(sample) else None,
+    }
+
+
+def free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the Snake and Ladders match server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--local", action="store_true", help="start a server in a child process on a free port")
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured after ramp-up")
+    parser.add_argument("--think", type=float, default=1.0,
+                        help="seconds each match waits before rolling (0 = roll as fast as possible)")
+    args = parser.parse_args()
+
+    server = None
+    if args.local:
+        args.port = free_port(args.host)
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=run_server, args=(args.host, args.port, args.matches * 2, ready),
+                                         daemon=True)
+        server.start()
+        ready.wait(10)
+
+    try:
+        result = asyncio.run(run_load(args.host, args.port, args.matches, args.connections,
+                                      args.duration, args.players, args.think))
+    finally:
+        if server is not None:
+            server.terminate()
+
+    print(f"{result['matches']} concurrent matches over {result['connections']} connections, "
+          f"{args.think:g} s between rolls")
+    print(f"{result['rolls']} rolls ({result['rolls_per_second']:.0f}/s), "
+          f"{result['games_finished']} games finished")
+    print(f"Roll-to-delta latency: p50 {result['p50_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import json
+
+from game_engine import GameEngine
+
+# Protocol: one JSON object per line in each direction.
+#   {"op": "create", "players": ["Ann", "Bob"], "seq": 1}
+#       -> {"type": "created", "match": 7, "players": [...], "seq": 1}
+#   {"op": "join", "match": 7, "seq": 2}
+#       -> {"type": "joined", "match": 7, "positions": [...], "current": 0, "seq": 2}
+#   {"op": "roll", "match": 7, "seq": 3}
+#       -> {"type": "delta", "match": 7, "turn": 1, "player": 0, "dice": 4,
+#           "from": 1, "to": 14, "jump": "ladder", "current": 1, "winner": null, "seq": 3}
+#   {"op": "leave", "match": 7, "seq": 4}
+#       -> {"type": "left", "match": 7, "seq": 4}
+# Only a connection that created or joined a match may roll or leave it.
+# Every connection watching a match receives its deltas; "seq" is echoed to
+# the connection that asked so it can match replies to requests. Finished
+# matches are dropped from the server after their last delta, unfinished
+# ones once nobody watches them any more (after a leave or a disconnect).
+DEFAULT_PORT = 8765
+MAX_PLAYERS = 8
+MAX_LINE = 1 << 16  # Longest request accepted before the connection is dropped
+
+
+class Match:
+    # One game on the server: the engine plus whoever is watching it
+    __slots__ = ("match_id", "engine", "watchers")
+
+    def __init__(self, match_id, names):
+        self.match_id = match_id
+        self.engine = GameEngine()
+        for name in names:
+            self.engine.add_player(name)
+        self.watchers = set()
+
+
+class MatchServer:
+    def __init__(self, max_matches=100000):
+        self.max_matches = max_matches
+        self.matches = {}
+        self.next_id = 1
+        self.rolls = 0
+
+    def create(self, names):
+        if not 1 <= len(names) <= MAX_PLAYERS:
+            raise ValueError(f"a match needs 1-{MAX_PLAYERS} players")
+        if len(self.matches) >= self.max_matches:
+            raise ValueError("server is full")
+        match = Match(self.next_id, names)
+        self.matches[match.match_id] = match
+        self.next_id += 1
+        return match
+
+    def get(self, match_id):
+        match = self.matches.get(match_id)
+        if match is None:
+            raise ValueError(f"no match {match_id}")
+        return match
+
+    def watched_by(self, match_id, transport):
+        # Only connections that created or joined a match may act on it
+        match = self.get(match_id)
+        if transport not in match.watchers:
+            raise ValueError(f"not watching match {match_id}")
+        return match
+
+    def leave(self, match_id, transport):
+        # Stop transport watching a match; a match nobody watches is dropped
+        match = self.matches.get(match_id)
+        if match is None:
+            return
+        match.watchers.discard(transport)
+        if not match.watchers:
+            del self.matches[match_id]
+
+    def roll(self, match):
+        # Apply one roll and return the delta every watcher is sent
+        engine = match.engine
+        move = engine.apply_roll()
+        self.rolls += 1
+        if engine.winner is not None:
+            del self.matches[match.match_id]
+        return {
+            "type": "delta", "match": match.match_id, "turn": engine.turn,
+            "player": move.player_index, "dice": move.dice_value,
+            "from": move.start, "to": move.end, "jump": move.jump,
+            "current": engine.current_player, "winner": engine.winner,
+        }
+
+    def handle_request(self, request, transport):
+        # Returns (reply for the sender, match whose watchers get it too)
+        op = request.get("op")
+        if op == "create":
+            names = request.get("players")
+            if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+                raise ValueError("players must be a list of names")
+            match = self.create(names)
+            match.watchers.add(transport)
+            return {"type": "created", "match": match.match_id,
+                    "players": [player.name for player in match.engine.players]}, None
+        if op == "join":
+            match = self.get(request.get("match"))
+            match.watchers.add(transport)
+            return {"type": "joined", "match": match.match_id,
+                    "players": [player.name for player in match.engine.players],
+                    "positions": list(match.engine.players.positions),
+                    "current": match.engine.current_player}, None
+        if op == "roll":
+            match = self.watched_by(request.get("match"), transport)
+            return self.roll(match), match
+        if op == "leave":
+            match = self.watched_by(request.get("match"), transport)
+            self.leave(match.match_id, transport)
+            return {"type": "left", "match": match.match_id}, None
+        raise ValueError(f"unknown op {op!r}")
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, ready=None):
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: MatchProtocol(self), host, port)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+class MatchProtocol(asyncio.Protocol):
+    # One client connection. Every complete line in a read is handled before
+    # anything is sent, and the replies go out in a single write per peer
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = b""
+        self.watched = set()  # Matches this connection created or joined
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        lines = (self.buffer + data).split(b"\n")
+        self.buffer = lines.pop()  # Incomplete last line, if any
+        if len(self.buffer) > MAX_LINE:
+            self.transport.close()
+            return
+
+        replies = []
+        broadcasts = {}  # other transport -> lines
+        for line in lines:
+            if not line.strip():
+                continue
+            request = {}
+            try:
+                request = json.loads(line)
+                reply, match = self.server.handle_request(request, self.transport)
+            except (ValueError, TypeError, AttributeError) as error:
+                reply, match = {"type": "error", "error": str(error)}, None
+                if not isinstance(request, dict):
+                    request = {}
+            if reply["type"] in ("created", "joined"):
+                self.watched.add(reply["match"])
+            elif reply["type"] == "left" or (reply["type"] == "delta" and reply["winner"] is not None):
+                self.watched.discard(reply["match"])
+
+            if match is not None and len(match.watchers) > 1:
+                data = json.dumps(reply).encode()
+                for watcher in match.watchers:
+                    if watcher is not self.transport:
+                        broadcasts.setdefault(watcher, []).append(data)
+            if "seq" in request:
+                reply["seq"] = request["seq"]
+            replies.append(json.dumps(reply).encode())
+
+        if replies:
+            self.transport.write(b"\n".join(replies) + b"\n")
+        for watcher, messages in broadcasts.items():
+            if not watcher.is_closing():
+                watcher.write(b"\n".join(messages) + b"\n")
+
+    def connection_lost(self, exc):
+        for match_id in self.watched:
+            self.server.leave(match_id, self.transport)
+
+
+def run_server(host="127.0.0.1", port=DEFAULT_PORT, max_matches=100000, ready=None):
+    # Blocking entry point, also used to start a server in a child process
+    server = MatchServer(max_matches)
+    try:
+        asyncio.run(server.serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many Snake and Ladders matches over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-matches", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"Serving matches on {args.host}:{args.port}")
+    run_server(args.host, args.port, args.max_matches)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import os
+import struct
+from array import array
+
+from game_engine import GameEngine
+from serialization import atomic_write, pack_board, pack_names, unpack_board, unpack_names
+
+# File layout (little endian):
+#   header    magic, version, snapshot interval, last cell, seed, counts
+#   board     (start, end) pairs for every snake, then every ladder
+#   names     length-prefixed UTF-8 player names
+#   dice      roll count, then two rolls per byte (one per nibble)
+# Snapshots are not stored; loading replays every roll once (a few
+# microseconds each) to rebuild them
+MAGIC = b"SNLR"
+VERSION = 1
+SNAPSHOT_INTERVAL = 64  # Turns between snapshots; a seek replays at most this many
+
+_HEADER = struct.Struct("<4sHHIQHHH")
+_COUNT = struct.Struct("<I")
+
+
+class Snapshot:
+    # Engine state after a given number of turns
+    __slots__ = ("turn", "current_player", "winner", "positions")
+
+    def __init__(self, turn, current_player, winner, positions):
+        self.turn = turn
+        self.current_player = current_player
+        self.winner = winner
+        self.positions = positions
+
+
+def pack_dice(dice):
+    packed = bytearray((len(dice) + 1) // 2)
+    for i, value in enumerate(dice):
+        packed[i // 2] |= value << (4 * (i % 2))
+    return bytes(packed)
+
+
+def unpack_dice(data, count):
+    dice = array("B")
+    for byte in data:
+        dice.append(byte & 0x0F)
+        dice.append(byte >> 4)
+    del dice[count:]
+    return dice
+
+
+class Replay:
+    # A match as its starting setup plus every dice value rolled. A shadow
+    # engine follows the recording and snapshots itself every few turns, so
+    # any turn can be reached by replaying only the rolls since the last one
+    def __init__(self, snakes, ladders, last_cell, names, seed, dice=(),
+                 snapshot_interval=SNAPSHOT_INTERVAL):
+        self.snakes = dict(snakes)
+        self.ladders = dict(ladders)
+        self.last_cell = last_cell
+        self.names = list(names)
+        self.seed = seed
+        self.snapshot_interval = snapshot_interval
+        self.dice = array("B")
+        self.snapshots = []
+        self.head = self.new_engine()
+        self.take_snapshot()
+        for value in dice:
+            self.record(value)
+
+    @classmethod
+    def for_engine(cls, engine, snapshot_interval=SNAPSHOT_INTERVAL):
+        # Start recording a match that is about to begin on engine
+        return cls(engine.snakes, engine.ladders, engine.last_cell,
+                   [player.name for player in engine.players], engine.seed,
+                   snapshot_interval=snapshot_interval)
+
+    def new_engine(self):
+        engine = GameEngine(self.snakes, self.ladders, self.last_cell, seed=self.seed)
+        for name in self.names:
+            engine.add_player(name)
+        return engine
+
+    def take_snapshot(self):
+        head = self.head
+        self.snapshots.append(Snapshot(head.turn, head.current_player, head.winner,
+                                       array("H", head.players.positions)))
+
+    @property
+    def turns(self):
+        return len(self.dice)
+
+    def record(self, dice_value):
+        if self.head.winner is not None:
+            raise ValueError("the game is already over")
+        self.dice.append(dice_value)
+        self.head.apply_roll(dice_value)
+        if self.head.turn % self.snapshot_interval == 0:
+            self.take_snapshot()
+
+    def seek(self, turn):
+        # Fresh engine holding the state after turn rolls
+        if not 0 <= turn <= self.turns:
+            raise IndexError(f"turn {turn} is outside 0-{self.turns}")
+        snapshot = self.snapshots[turn // self.snapshot_interval]
+        engine = self.new_engine()
+        engine.players.positions[:] = array("H", snapshot.positions)
+        engine.current_player = snapshot.current_player
+        engine.winner = snapshot.winner
+        engine.turn = snapshot.turn
+        for value in self.dice[snapshot.turn:turn]:
+            engine.apply_roll(value)
+        return engine
+
+    def moves(self, start=0, stop=None):
+        # Moves of turns start..stop-1, e.g. to re-render a highlight
+        stop = self.turns if stop is None else stop
+        engine = self.seek(start)
+        for value in self.dice[start:stop]:
+            yield engine.apply_roll(value)
+
+    def verify(self):
+        # First turn whose roll does not come from the recorded seed, or None
+        engine = self.new_engine()
+        for turn, value in enumerate(self.dice):
+            if engine.roll() != value:
+                return turn
+        return None
+
+    def to_bytes(self):
+        return b"".join((
+            _HEADER.pack(MAGIC, VERSION, self.snapshot_interval, self.last_cell, self.seed,
+                         len(self.names), len(self.snakes), len(self.ladders)),
+            pack_board(self.snakes, self.ladders),
+            pack_names(self.names),
+            _COUNT.pack(len(self.dice)),
+            pack_dice(self.dice),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, interval, last_cell, seed, n_names, n_snakes, n_ladders = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a replay file")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        snakes, ladders, offset = unpack_board(data, n_snakes, n_ladders, _HEADER.size)
+        names, offset = unpack_names(data, n_names, offset)
+
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        dice = unpack_dice(data[offset:offset + (count + 1) // 2], count)
+        return cls(snakes, ladders, last_cell, names, seed, dice, snapshot_interval=interval)
+
+    def save(self, path):
+        atomic_write(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a recorded Snake and Ladders match")
+    parser.add_argument("path")
+    parser.add_argument("--turn", type=int, default=None, help="show the board after this many turns (default: the end)")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    turn = replay.turns if args.turn is None else args.turn
+    engine = replay.seek(turn)
+
+    print(f"{replay.turns} turns, seed {replay.seed}, {os.path.getsize(args.path)} bytes")
+    mismatch = replay.verify()
+    if mismatch is not None:
+        print(f"Warning: roll {mismatch + 1} does not match the recorded seed")
+    print(f"After turn {turn}:")
+    for index, player in enumerate(engine.players):
+        marker = " (winner)" if engine.winner == index else " (to roll)" if engine.current_player == index and engine.winner is None else ""
+        print(f"  {player.name}: {player.position}{marker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import mmap
+import queue
+import struct
+import threading
+from array import array
+
+from game_engine import GameEngine, Move
+from replay import Replay
+from serialization import atomic_write, pack_board, pack_names, unpack_board, unpack_names
+
+# A snapshot is one fixed-size header followed by variable sections that the
+# header points at, so a reader can map the file and look at any field (the
+# game state, whose turn it is, every position) without decoding the rest.
+# Multi-byte values are little endian; array sections are stored as raw
+# native arrays, which is little endian on every machine we ship to.
+MAGIC = b"SNLS"
+VERSION = 1
+
+GAME_STATES = ("menu", "setup", "game", "game_over")
+JUMPS = (None, "snake", "ladder")
+
+HEADER_FIELDS = (
+    "magic", "version", "game_state", "dice_value", "dice_rolling", "moving_animation",
+    "target_players", "current_player", "winner", "animation_index", "turn", "last_cell",
+    "seed", "n_players", "n_snakes", "n_ladders", "path_length",
+    "pending", "pending_player", "pending_dice", "pending_start", "pending_jump",
+    "positions_offset", "path_offset", "board_offset", "names_offset", "rng_offset",
+    "dice_offset", "dice_count",
+)
+_HEADER = struct.Struct("<4sHBBBBHHhHIIQHHHHBHBHBIIIIIII")
+_RNG_EXTRA = struct.Struct("<B?d")  # Random state version, gauss_next is set, gauss_next
+_RNG_WORDS = 625  # Mersenne Twister state words, position included
+
+
+def capture(game):
+    # Encode the complete state of a running EnhancedSnakeAndLadderGame
+    engine = game.engine
+    positions = engine.players.positions.tobytes()
+    pending = game.pending_move
+    path = array("H", game.animation_path if pending is not None else ()).tobytes()
+    board = pack_board(engine.snakes, engine.ladders)
+    names = pack_names(player.name for player in engine.players)
+    rng_version, words, gauss_next = engine.rng.getstate()
+    rng = _RNG_EXTRA.pack(rng_version, gauss_next is not None, gauss_next or 0.0) + array("I", words).tobytes()
+    dice = game.replay.dice.tobytes() if game.replay is not None else b""
+
+    offsets = []
+    offset = _HEADER.size
+    for section in (positions, path, board, names, rng, dice):
+        offsets.append(offset)
+        offset += len(section)
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, GAME_STATES.index(game.game_state), game.dice_value,
+        game.dice_rolling, game.moving_animation, game.target_players,
+        engine.current_player, -1 if engine.winner is None else engine.winner,
+        game.animation_index, engine.turn, engine.last_cell,
+        engine.seed, len(engine.players), len(engine.snakes), len(engine.ladders), len(path) // 2,
+        pending is not None,
+        pending.player_index if pending is not None else 0,
+        pending.dice_value if pending is not None else 0,
+        pending.start if pending is not None else 0,
+        JUMPS.index(pending.jump) if pending is not None else 0,
+        *offsets, len(dice),
+    )
+    return b"".join((header, positions, path, board, names, rng, dice))
+
+
+def write_snapshot(path, data):
+    # Atomic and durable: readers see the old file or the new one, never half
+    atomic_write(path, data, durable=True)
+
+
+class SnapshotView:
+    # Read-only view of a snapshot. Header fields are attributes, array
+    # sections are zero-copy memoryviews into the mapped file
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.map = None
+            self.buffer = memoryview(source)
+        else:
+            with open(source, "rb") as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.buffer = memoryview(self.map)
+        if len(self.buffer) < _HEADER.size:
+            self.close()
+            raise ValueError("snapshot is truncated")
+        for name, value in zip(HEADER_FIELDS, _HEADER.unpack_from(self.buffer)):
+            setattr(self, name, value)
+        if self.magic != MAGIC:
+            self.close()
+            raise ValueError("not a snapshot file")
+        if self.version != VERSION:
+            self.close()
+            raise ValueError(f"unsupported snapshot version {self.version}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Views handed out by positions() etc. must be released first
+        self.buffer.release()
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    @property
+    def state(self):
+        return GAME_STATES[self.game_state]
+
+    def positions(self):
+        start = self.positions_offset
+        return self.buffer[start:start + 2 * self.n_players].cast("H")
+
+    def animation_path(self):
+        start = self.path_offset
+        return self.buffer[start:start + 2 * self.path_length].cast("H")
+
+    def dice(self):
+        return self.buffer[self.dice_offset:self.dice_offset + self.dice_count]
+
+    def board(self):
+        snakes, ladders, _ = unpack_board(self.buffer, self.n_snakes, self.n_ladders, self.board_offset)
+        return snakes, ladders
+
+    def names(self):
+        return unpack_names(self.buffer, self.n_players, self.names_offset)[0]
+
+    def rng_state(self):
+        rng_version, has_gauss, gauss_next = _RNG_EXTRA.unpack_from(self.buffer, self.rng_offset)
+        start = self.rng_offset + _RNG_EXTRA.size
+        words = tuple(self.buffer[start:start + 4 * _RNG_WORDS].cast("I"))
+        return rng_version, words, gauss_next if has_gauss else None
+
+    def engine(self):
+        # A GameEngine in exactly the saved state
+        snakes, ladders = self.board()
+        engine = GameEngine(snakes, ladders, self.last_cell, seed=self.seed)
+        for name in self.names():
+            engine.add_player(name)
+        with self.positions() as positions:
+            engine.players.positions[:] = array("H", positions.tobytes())
+        engine.rng.setstate(self.rng_state())
+        engine.current_player = self.current_player
+        engine.winner = None if self.winner < 0 else self.winner
+        engine.turn = self.turn
+        return engine
+
+    def apply(self, game):
+        # Restore the view state of a game built on self.engine(); timers
+        # restart so an interrupted roll or step simply plays out again
+        game.game_state = self.state
+        game.dice_value = self.dice_value
+        game.target_players = self.target_players
+        game.dice_rolling = bool(self.dice_rolling)
+        game.moving_animation = bool(self.moving_animation)
+        game.pending_move = None
+        game.animation_path = []
+        game.animation_index = self.animation_index
+        if self.pending:
+            with self.animation_path() as path:
+                game.animation_path = path.tolist()
+            game.pending_move = Move(self.pending_player, self.pending_dice, self.pending_start,
+                                     game.animation_path, JUMPS[self.pending_jump])
+        if game.game_state in ("game", "game_over"):
+            engine = game.engine
+            game.replay = Replay(engine.snakes, engine.ladders, engine.last_cell,
+                                 [player.name for player in engine.players], engine.seed, self.dice())
+        game.occupancy.rebuild(game.engine.players.positions)
+        if game.pending_move is not None:
+            # The moving token is not part of any stack while it moves
+            game.occupancy.remove(self.pending_player, self.pending_start)
+        game.needs_full_redraw = True
+
+
+class Checkpointer:
+    # Writes snapshots on a background thread so a slow disk never holds up
+    # a frame. Only the newest pending snapshot is kept
+    def __init__(self, path):
+        self.path = path
+        self.pending = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self.run, name="checkpoint-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, data):
+        try:
+            self.pending.get_nowait()  # Drop an older snapshot nobody has written yet
+        except queue.Empty:
+            pass
+        self.pending.put(data)
+
+    def run(self):
+        while True:
+            data = self.pending.get()
+            if data is None:
+                return
+            try:
+                write_snapshot(self.path, data)
+            except OSError as error:
+                print(f"Could not write checkpoint: {error}")
+
+    def close(self):
+        # Let the writer finish whatever is queued, then stop it
+        self.pending.put(None)
+        self.thread.join()
@@ -0,0 +1,57 @@
+import os
+import struct
+
+# Pieces shared by every file and wire format: length-prefixed player names,
+# the snake and ladder layout as (start, end) pairs, and writing a file so
+# readers never see half of it
+_PAIR = struct.Struct("<HH")
+
+
+def pack_names(names):
+    # Each name as a length byte then at most 255 bytes of UTF-8
+    return b"".join(bytes((len(encoded),)) + encoded
+                    for encoded in (name.encode("utf-8")[:255] for name in names))
+
+
+def unpack_names(data, count, offset=0):
+    # count names starting at offset; returns them and the offset after them
+    names = []
+    for _ in range(count):
+        if offset >= len(data) or offset + 1 + data[offset] > len(data):
+            raise ValueError("names are truncated")
+        length = data[offset]
+        names.append(bytes(data[offset + 1:offset + 1 + length]).decode("utf-8", "replace"))
+        offset += 1 + length
+    return names, offset
+
+
+def pack_board(snakes, ladders):
+    # Every snake's (start, end) pair, then every ladder's, each sorted by start
+    return b"".join(_PAIR.pack(start, end)
+                    for jumps in (snakes, ladders)
+                    for start, end in sorted(jumps.items()))
+
+
+def unpack_board(data, n_snakes, n_ladders, offset=0):
+    # Returns snakes, ladders and the offset after the board
+    boards = []
+    for count in (n_snakes, n_ladders):
+        jumps = {}
+        for _ in range(count):
+            start, end = _PAIR.unpack_from(data, offset)
+            jumps[start] = end
+            offset += _PAIR.size
+        boards.append(jumps)
+    return boards[0], boards[1], offset
+
+
+def atomic_write(path, data, durable=False):
+    # Write to a temporary file first so readers see the old file or the new
+    # one, never half; durable also waits until the data is on disk
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_path, path)
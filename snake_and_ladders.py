@@ -1,24 +1,45 @@
+import argparse
 import pygame
 import sys
 import random
 import os
 import time
 import math
+from collections import OrderedDict
 from pygame.locals import *
-
-# Initialize pygame
-pygame.init()
-pygame.mixer.init()
+from game_engine import GameEngine, random_layout
+from board_view import (WIGGLE_KEYFRAMES, Camera, CellOccupancy, SnakePaths, build_jump_index, cell_center,
+                        grid_to_cell)
+from asset_manager import AssetManager, LazyFont
+from replay import Replay
+from savegame import Checkpointer, SnapshotView, capture
+from lockstep import DEFAULT_PORT as LOCKSTEP_PORT, LockstepSession
+from frame_profiler import FrameProfiler
+from timestep import FixedTimestep
+from markov_analysis import PASSAGE_PENDING, passage_table, win_probabilities
 
 # Constants
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 700
 BOARD_SIZE = 600
-GRID_SIZE = 10  # 10x10 grid
-CELL_SIZE = BOARD_SIZE // GRID_SIZE
+GRID_SIZE = 10  # 10x10 grid by default; any size up to MAX_GRID_SIZE works
+CELL_SIZE = BOARD_SIZE // GRID_SIZE  # Cell size all board drawing is designed for
+MAX_GRID_SIZE = 100
+MIN_NUMBER_CELL_SIZE = 30  # Smaller cells are drawn without their numbers
+ZOOM_STEP = 1.25
+PAN_KEYS = {K_LEFT: (-1, 0), K_RIGHT: (1, 0), K_UP: (0, -1), K_DOWN: (0, 1)}
 DICE_SIZE = 80
 PLAYER_SIZE = 30
 ANIMATION_SPEED = 5
+FPS = 60
+SIM_STEP_MS = 50  # Dice and movement advance in fixed steps of this length
+DICE_ROLL_STEPS = 1000 // SIM_STEP_MS  # The dice roll for a second
+MOVE_STEPS = 300 // SIM_STEP_MS  # Each cell of a move takes 300 ms
+ATTRACT_RESTART_MS = 5000  # A game between bots only starts over this long after the win
+IDLE_WAIT_MS = 500  # Longest the idle loop sleeps before redrawing anyway
+PULSE_FRAMES = 32  # Precomputed steps of the game-over text pulse
+WIGGLE_FRAME_MS = 150  # How long the snakes hold each wiggle keyframe
+CHECKPOINT_INTERVAL_MS = 1000  # Most often a running match is checkpointed
 
 # Colors
 WHITE = (255, 255, 255)
@@ -40,95 +61,451 @@ LADDER_COLOR = (50, 205, 50)
 # Player colors and icons
 PLAYER_COLORS = [RED, BLUE, GREEN, YELLOW]
 PLAYER_NAMES = ["Red", "Blue", "Green", "Yellow"]
+MAX_PLAYERS = 256  # Classroom matches seat a whole year group
+
+def player_color(index):
+    # The classic four colours first, then hues spread by the golden angle
+    if index < len(PLAYER_COLORS):
+        return PLAYER_COLORS[index]
+    color = pygame.Color(0, 0, 0)
+    color.hsva = ((index * 137.508) % 360, 80, 85, 100)
+    return (color.r, color.g, color.b)
+
+def build_layouts():
+    # Named widget rects for every screen. Drawing and click hit-testing both
+    # read from here, so a click never has to render anything
+    center_x = SCREEN_WIDTH // 2
+    layouts = {}
+    
+    # Main menu buttons
+    button_width = 200
+    button_height = 60
+    button_spacing = 20
+    start_y = 250
+    layouts["menu"] = {}
+    for i, name in enumerate(["play", "rules", "credits", "quit"]):
+        layouts["menu"][name] = pygame.Rect(center_x - button_width // 2,
+                                            start_y + i * (button_height + button_spacing),
+                                            button_width, button_height)
+    
+    # Rules and credits panels
+    for name, (panel_width, panel_height) in (("rules", (700, 500)), ("credits", (600, 400))):
+        panel = pygame.Rect(center_x - panel_width // 2, SCREEN_HEIGHT // 2 - panel_height // 2,
+                            panel_width, panel_height)
+        layouts[name] = {
+            "panel": panel,
+            "close": pygame.Rect(center_x - 60, panel.bottom - 60, 120, 40),
+        }
+    
+    # Setup screen
+    layouts["setup"] = {
+        "input": pygame.Rect(center_x - 150, 340, 300, 50),
+        "add": pygame.Rect(center_x - 100, 410, 200, 50),
+        "start": pygame.Rect(center_x - 100, SCREEN_HEIGHT - 100, 200, 60),
+        "back": pygame.Rect(50, SCREEN_HEIGHT - 100, 120, 50),
+    }
+    for count in range(2, 5):
+        layouts["setup"][f"count_{count}"] = pygame.Rect(center_x - 150 + (count - 2) * 100, 200, 80, 60)
+    
+    # Game screen
+    dice_x = SCREEN_WIDTH - DICE_SIZE - 40
+    dice_y = (SCREEN_HEIGHT - DICE_SIZE) // 2
+    layouts["game"] = {
+        "dice": pygame.Rect(dice_x, dice_y, DICE_SIZE, DICE_SIZE),
+        "roll": pygame.Rect(dice_x, dice_y + DICE_SIZE + 20, DICE_SIZE, 40),
+        "menu": pygame.Rect(20, SCREEN_HEIGHT - 60, 120, 40),
+        "status": pygame.Rect(BOARD_SIZE + (SCREEN_WIDTH - BOARD_SIZE) // 2 + 5, dice_y + DICE_SIZE + 70,
+                              (SCREEN_WIDTH - BOARD_SIZE) // 2 - 10, 30),
+    }
+    
+    # Game over panel
+    panel = pygame.Rect(center_x - 250, SCREEN_HEIGHT // 2 - 150, 500, 300)
+    layouts["game_over"] = {
+        "panel": panel,
+        "menu": pygame.Rect(center_x - 80, panel.bottom - 60, 160, 50),
+    }
+    
+    return layouts
+
+LAYOUTS = build_layouts()
+
+# Player panel rows between the title and the menu button
+INFO_ROW_HEIGHT = 50
+INFO_ROWS = (LAYOUTS["game"]["menu"].top - 90) // INFO_ROW_HEIGHT
+
+# Startup timing: seconds spent in each phase, in the order they happened
+STARTUP_REPORT = os.environ.get("SNAKE_LADDERS_STARTUP_REPORT") == "1"
+startup_begin = time.perf_counter()
+startup_timings = OrderedDict()
+
+def record_startup(phase, seconds):
+    startup_timings[phase] = startup_timings.get(phase, 0.0) + seconds
+
+def startup_report():
+    lines = [f"{phase:<32}{seconds * 1000:8.1f} ms" for phase, seconds in startup_timings.items()]
+    return "Startup timings:\n" + "\n".join(lines)
+
+# Every subsystem is created on first use: the display by init_display(),
+# fonts on their first render and sounds once the first frame is up
+screen = None
+clock = None
+font_small = LazyFont('Arial', 20, timer=record_startup)
+font_medium = LazyFont('Arial', 30, timer=record_startup)
+font_large = LazyFont('Arial', 40, timer=record_startup)
+font_title = LazyFont('Arial', 60, bold=True, timer=record_startup)
+assets = AssetManager(timer=record_startup)
+profiler = FrameProfiler()  # F3 shows per-phase frame timings, F4 exports them
+dice_sound = assets.sound("dice")
+move_sound = assets.sound("move")
+snake_sound = assets.sound("snake")
+ladder_sound = assets.sound("ladder")
+win_sound = assets.sound("win")
+
+class TextCache:
+    # Bounded LRU of rendered text surfaces keyed by (font, text, color, antialias).
+    # Callers must treat the returned surfaces as read-only.
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.surfaces)}
+
+text_cache = TextCache()
+
+def init_display(size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+    global screen, clock
+    if screen is not None:
+        return screen
+
+    # Set up the display
+    start = time.perf_counter()
+    pygame.display.init()
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption('Snake and Ladders Game(Ft.Wiggly snakes)')
+    clock = pygame.time.Clock()  # Also starts the SDL timer behind get_ticks()
+    record_startup("display", time.perf_counter() - start)
+
+    return screen
 
-# Set up the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption('Snake and Ladders Game(Ft.Wiggly snakes)')
-
-# Load fonts
-font_small = pygame.font.SysFont('Arial', 20)
-font_medium = pygame.font.SysFont('Arial', 30)
-font_large = pygame.font.SysFont('Arial', 40)
-font_title = pygame.font.SysFont('Arial', 60, bold=True)
-
-# Load sounds
-try:
-    dice_sound = pygame.mixer.Sound('dice_roll.wav')
-    move_sound = pygame.mixer.Sound('move.wav')
-    snake_sound = pygame.mixer.Sound('snake.wav')
-    ladder_sound = pygame.mixer.Sound('ladder.wav')
-    win_sound = pygame.mixer.Sound('win.wav')
-except:
-    # If sound files are not found, create silent sounds
-    dice_sound = pygame.mixer.Sound(buffer=bytearray(44))
-    move_sound = pygame.mixer.Sound(buffer=bytearray(44))
-    snake_sound = pygame.mixer.Sound(buffer=bytearray(44))
-    ladder_sound = pygame.mixer.Sound(buffer=bytearray(44))
-    win_sound = pygame.mixer.Sound(buffer=bytearray(44))
-    print("Sound files not found. Using silent sounds.")
+def screen_cell(camera, cell):
+    # Whole-pixel screen position of a cell's centre under camera
+    x, y = camera.to_screen(*cell_center(cell, camera.grid_size))
+    return int(round(x)), int(round(y))
+
+def render_board(surface, snakes, ladders, camera, keyframe=0, jump_index=None, snake_paths=None):
+    # Static board as camera sees it: cells, snakes (in one wiggle keyframe),
+    # ladders and numbers, drawn onto surface at the camera's viewport. Only
+    # the part of the board inside the view is drawn. Callers that draw the
+    # same board again pass its jump index and snake paths to reuse them
+    grid_size = camera.grid_size
+    scale = camera.cell_size / CELL_SIZE
+    viewport = pygame.Rect(camera.viewport)
+    surface.set_clip(viewport)
+    
+    # Draw board background
+    left, top = camera.to_screen(0, 0)
+    right, bottom = camera.to_screen(grid_size, grid_size)
+    board_rect = pygame.Rect(round(left), round(top), round(right - left), round(bottom - top))
+    pygame.draw.rect(surface, BOARD_COLOR, board_rect)
+    pygame.draw.rect(surface, BLACK, board_rect, 2)
+
+    # Draw grid cells with alternating colors
+    cols, rows = camera.visible_grid_range()
+    cell_px = camera.cell_size
+    for row in rows:
+        for col in cols:
+            cell_x, cell_y = camera.to_screen(col, row)
+            cell_rect = pygame.Rect(round(cell_x), round(cell_y),
+                                    round(cell_x + cell_px) - round(cell_x),
+                                    round(cell_y + cell_px) - round(cell_y))
+            
+            # Alternating cell colors
+            if (row + col) % 2 == 0:
+                cell_color = (230, 230, 230)
+            else:
+                cell_color = (210, 210, 210)
+            
+            pygame.draw.rect(surface, cell_color, cell_rect)
+            pygame.draw.rect(surface, GRID_COLOR, cell_rect, 1)
+
+    # Only snakes and ladders near the view are drawn
+    if jump_index is None:
+        jump_index = build_jump_index(snakes, ladders, grid_size)
+    visible = jump_index.query(*camera.visible_world_rect())
+
+    # Draw snakes: every visible body comes out of one array transform
+    if snake_paths is None:
+        snake_paths = SnakePaths(snakes, grid_size)
+    snake_starts = sorted(start for kind, start in visible if kind == "snake")
+    bodies = snake_paths.bodies(snake_starts, keyframe, camera).tolist()
+    for start, body in zip(snake_starts, bodies):
+        end = snakes[start]
+        start_pos = screen_cell(camera, start)
+        end_pos = screen_cell(camera, end)
+        
+        # Draw snake body (curved line)
+        pygame.draw.lines(surface, SNAKE_COLOR, False, body, max(1, round(5 * scale)))
+        
+        # Draw snake head
+        pygame.draw.circle(surface, SNAKE_COLOR, start_pos, max(2, round(10 * scale)))
+        
+        # Draw snake tail
+        pygame.draw.circle(surface, (200, 0, 0), end_pos, max(1, round(7 * scale)))
+
+    # Draw ladders
+    for kind, start in sorted(visible):
+        if kind != "ladder":
+            continue
+        end = ladders[start]
+        start_pos = screen_cell(camera, start)
+        end_pos = screen_cell(camera, end)
+        
+        # Calculate ladder width
+        ladder_width = 10 * scale
+        
+        # Calculate perpendicular vector for ladder sides
+        dx = end_pos[0] - start_pos[0]
+        dy = end_pos[1] - start_pos[1]
+        length = (dx**2 + dy**2)**0.5
+        
+        if length > 0:
+            perpx = -dy / length * ladder_width / 2
+            perpy = dx / length * ladder_width / 2
+            side_width = max(1, round(3 * scale))
+            
+            # Draw ladder sides
+            pygame.draw.line(surface, LADDER_COLOR, 
+                           (start_pos[0] + perpx, start_pos[1] + perpy),
+                           (end_pos[0] + perpx, end_pos[1] + perpy), side_width)
+            pygame.draw.line(surface, LADDER_COLOR, 
+                           (start_pos[0] - perpx, start_pos[1] - perpy),
+                           (end_pos[0] - perpx, end_pos[1] - perpy), side_width)
+            
+            # Draw ladder rungs
+            num_rungs = int(length / (30 * scale))
+            for i in range(1, num_rungs + 1):
+                t = i / (num_rungs + 1)
+                rung_x1 = start_pos[0] + dx * t + perpx
+                rung_y1 = start_pos[1] + dy * t + perpy
+                rung_x2 = start_pos[0] + dx * t - perpx
+                rung_y2 = start_pos[1] + dy * t - perpy
+                pygame.draw.line(surface, LADDER_COLOR, (rung_x1, rung_y1), (rung_x2, rung_y2),
+                                 max(1, round(2 * scale)))
+
+    # Draw numbers for the visible cells
+    show_numbers = camera.cell_size >= MIN_NUMBER_CELL_SIZE
+    for row in rows:
+        for col in cols:
+            i = grid_to_cell(col, row, grid_size)
+            pos = screen_cell(camera, i)
+            
+            # Highlight special cells
+            if i in snakes:
+                pygame.draw.circle(surface, (255, 200, 200), pos, max(2, round(15 * scale)))
+            elif i in ladders:
+                pygame.draw.circle(surface, (200, 255, 200), pos, max(2, round(15 * scale)))
+            
+            if show_numbers:
+                num_text = text_cache.render(font_small, str(i), True, BLACK)
+                num_rect = num_text.get_rect(center=pos)
+                surface.blit(num_text, num_rect)
+    
+    surface.set_clip(None)
+
+def render_tokens(surface, camera, occupancy, token):
+    # Resting tokens stacked per cell as laid out by occupancy, skipping cells
+    # outside the camera view. token(seat) gives (image, rect of the image to
+    # blit or None for all of it); returns the rects drawn
+    rects = []
+    for cell in occupancy.cells:
+        wx, wy = cell_center(cell, camera.grid_size)
+        if not camera.contains(wx, wy, margin=1):
+            continue  # Off screen
+        x, y = screen_cell(camera, cell)
+        for seat, offset_x, offset_y in occupancy.layout(cell):
+            image, area = token(seat)
+            rect = pygame.Rect(area) if area is not None else image.get_rect()
+            rect.center = (x + offset_x, y + offset_y)
+            surface.blit(image, rect, area)
+            rects.append(rect)
+    return rects
 
 class EnhancedSnakeAndLadderGame:
-    def __init__(self):
-        self.players = []
-        self.current_player = 0
+    def __init__(self, engine=None, grid_size=GRID_SIZE):
+        init_display()
+
+        # Rules and player state live in the headless engine; this class only
+        # times, animates and draws what the engine decides
+        if engine is None:
+            if not 2 <= grid_size <= MAX_GRID_SIZE:
+                raise ValueError(f"grid_size must be between 2 and {MAX_GRID_SIZE}")
+            if grid_size == GRID_SIZE:
+                engine = GameEngine()
+            else:
+                snakes, ladders = random_layout(grid_size * grid_size)
+                engine = GameEngine(snakes, ladders, last_cell=grid_size * grid_size)
+        self.engine = engine
+        self.grid_size = math.isqrt(self.engine.last_cell)
+        
+        # Players added to the engine directly get their seat's colour and token
+        for player in self.engine.players:
+            if player.color is None:
+                player.color = player_color(player.index)
+            if player.token_index is None:
+                player.token_index = player.index
         self.dice_value = 1
         self.game_state = "menu"  # menu, setup, game, game_over
-        self.winner = None
         self.dice_rolling = False
-        self.dice_roll_time = 0
+        self.dice_steps = 0  # Steps the dice have been rolling for
         self.target_players = 0
         self.input_text = ""
         self.input_active = False
         self.moving_animation = False
-        self.animation_start_time = 0
+        self.animation_steps = 0  # Steps spent on the current cell of the move
         self.animation_start_pos = 0
         self.animation_end_pos = 0
         self.animation_current_pos = 0
         self.animation_path = []
         self.animation_index = 0
+        self.pending_move = None
+        self.timestep = FixedTimestep(SIM_STEP_MS)
+        self.bots = set()  # Seats that roll for themselves
+        self.turbo = 0  # When set, a move takes one update and every turbo-th turn is drawn
+        self.game_over_time = 0
+        self.games_finished = 0
+        self.win_chances = None  # Each seat's chance of winning, None when not known
+        self.win_chances_key = None
+        self.turns_finished = 0  # Turns of all finished games together
+        self.replay = None  # Dice log of the match in progress
+        self.replay_path = None  # Finished matches are saved here, one file per seed, when set
+        self.net = None  # LockstepSession when playing online
+        self.remote_dice = None  # Dice another peer rolled for the roll being shown
         self.show_rules = False
         self.show_credits = False
         
-        # Game elements
-        self.snakes = {
-            16: 6, 47: 26, 49: 11, 65: 53, 62: 19,
-            64: 60, 87: 24, 93: 73, 95: 75, 98: 78
-        }
-        self.ladders = {
-            1: 38, 4: 14, 9: 31, 21: 42, 28: 84,
-            36: 44, 51: 67, 71: 91, 80: 100
-        }
-        
-        # Create board positions
-        self.board_positions = self.create_board_positions()
-        self.sound_enabled = True  # Sound effects toggle
+        # Camera over the board; large boards scroll and zoom inside BOARD_SIZE
+        fit_cell_size = BOARD_SIZE / self.grid_size
+        self.camera = Camera(((SCREEN_WIDTH - BOARD_SIZE) // 2, (SCREEN_HEIGHT - BOARD_SIZE) // 2,
+                              BOARD_SIZE, BOARD_SIZE),
+                             self.grid_size,
+                             cell_size=max(fit_cell_size, CELL_SIZE / 2),
+                             max_cell_size=max(fit_cell_size, CELL_SIZE))
+        self.camera.center_on(*cell_center(1, self.grid_size))
+        self.jump_index = None
+        self.snake_paths = None
+        self.baked_camera = None
+        
+        # Which seats rest on which cell; the moving token is lifted out of it
+        self.occupancy = CellOccupancy(PLAYER_SIZE)
         self.sound_enabled = True  # Sound effects toggle
         
-        # Load dice images
-        self.dice_images = self.load_dice_images()
-        
-        # Create player tokens
-        self.player_tokens = self.create_player_tokens()
+        # Dice images and player tokens are built on first use
+        self._dice_images = None
+        self._player_tokens = None
+        
+        # Cached game background (board baked in) and dirty-rect bookkeeping
+        self.game_background = None
+        self.baked_snakes = None
+        self.baked_ladders = None
+        self.needs_full_redraw = True
+        self.last_frame_state = None
+        
+        # The baked background shows one wiggle keyframe at a time. Only the
+        # screen around the snakes differs between keyframes, so each one is
+        # kept as patches for those rects, baked the first time it comes up
+        self.background_keyframe = None
+        self.wiggle_rects = []
+        self.wiggle_patches = {}
+        self.wiggle_scratch = None
+        self.token_rects = []
+        self.info_panel_rect = pygame.Rect(0, 0, 0, 0)
+        self.dice_panel_rect = pygame.Rect(SCREEN_WIDTH - DICE_SIZE - 60,
+                                           (SCREEN_HEIGHT - DICE_SIZE) // 2 - 45,
+                                           DICE_SIZE + 40, DICE_SIZE + 110)
+        self.dice_panel_rect.union_ip(LAYOUTS["game"]["status"])
+        
+        # Reusable overlays and precomputed celebration animation frames
+        self.overlays = {}
+        self.pulse_frames = None
+        self.spin_frames = {}
+        self.game_over_scene = None
+        self.game_over_scene_key = None
 
-    def create_board_positions(self):
-        positions = {}
-        board_x = (SCREEN_WIDTH - BOARD_SIZE) // 2
-        board_y = (SCREEN_HEIGHT - BOARD_SIZE) // 2
-        
-        for i in range(1, 101):
-            row = (i - 1) // GRID_SIZE
-            col = (i - 1) % GRID_SIZE
-            
-            # Reverse column order for odd rows to create snake pattern
-            if row % 2 == 1:
-                col = GRID_SIZE - 1 - col
-            
-            x = board_x + col * CELL_SIZE + CELL_SIZE // 2
-            y = board_y + (GRID_SIZE - 1 - row) * CELL_SIZE + CELL_SIZE // 2
-            
-            positions[i] = (x, y)
-        
-        return positions
+    @property
+    def dice_images(self):
+        if self._dice_images is None:
+            start = time.perf_counter()
+            self._dice_images = self.load_dice_images()
+            record_startup("dice images", time.perf_counter() - start)
+        return self._dice_images
+
+    @property
+    def player_tokens(self):
+        if self._player_tokens is None:
+            start = time.perf_counter()
+            self._player_tokens = self.create_player_tokens()
+            record_startup("player tokens", time.perf_counter() - start)
+        return self._player_tokens
+
+    # Game state is read from and written to the engine
+    @property
+    def players(self):
+        return self.engine.players
+
+    @property
+    def current_player(self):
+        return self.engine.current_player
+
+    @current_player.setter
+    def current_player(self, value):
+        self.engine.current_player = value
+
+    @property
+    def winner(self):
+        return self.engine.winner
+
+    @winner.setter
+    def winner(self, value):
+        self.engine.winner = value
+
+    @property
+    def snakes(self):
+        return self.engine.snakes
+
+    @property
+    def ladders(self):
+        return self.engine.ladders
+
+    def cell_position(self, cell):
+        # Screen position of a cell's centre under the current camera
+        return screen_cell(self.camera, cell)
+
+    def board_scrolls(self):
+        view_w, view_h = self.camera.view_size()
+        return view_w < self.grid_size or view_h < self.grid_size
 
     def load_dice_images(self):
         dice_images = []
@@ -170,9 +547,17 @@ class EnhancedSnakeAndLadderGame:
         
         return dice_images
 
-    def create_player_tokens(self):
+    def player_token(self, token_index):
+        # Tokens beyond the first four are made the first time a seat needs one
+        tokens = self.player_tokens
+        if token_index >= len(tokens):
+            tokens.extend(self.create_player_tokens(range(len(tokens), token_index + 1)))
+        return tokens[token_index]
+
+    def create_player_tokens(self, indices=range(len(PLAYER_COLORS))):
         tokens = []
-        for color in PLAYER_COLORS:
+        for index in indices:
+            color = player_color(index)
             token = pygame.Surface((PLAYER_SIZE, PLAYER_SIZE), pygame.SRCALPHA)
             pygame.draw.circle(token, color, (PLAYER_SIZE//2, PLAYER_SIZE//2), PLAYER_SIZE//2)
             pygame.draw.circle(token, BLACK, (PLAYER_SIZE//2, PLAYER_SIZE//2), PLAYER_SIZE//2, 2)
@@ -180,220 +565,230 @@ class EnhancedSnakeAndLadderGame:
         return tokens
 
     def add_player(self, name):
-        if len(self.players) < 4:
-            player_color = PLAYER_COLORS[len(self.players)]
-            self.players.append({
-                "name": name,
-                "position": 1,
-                "color": player_color,
-                "token_index": len(self.players)
-            })
+        if len(self.players) < MAX_PLAYERS:
+            self.engine.add_player(name,
+                                   color=player_color(len(self.players)),
+                                   token_index=len(self.players))
+
+    def can_roll(self):
+        # Online, only the seat whose turn it is rolls, once everybody has
+        # confirmed the previous move
+        if self.dice_rolling or self.moving_animation:
+            return False
+        return self.net is None or self.net.can_roll(self.current_player, self.engine.turn)
 
     def roll_dice(self):
         if not self.dice_rolling and not self.moving_animation:
             dice_sound.play()
             self.dice_rolling = True
-            self.dice_roll_time = pygame.time.get_ticks()
+            self.dice_steps = 0
+            self.timestep.reset(pygame.time.get_ticks())
 
     def update_dice(self):
+        # One simulation step of the dice roll
         if self.dice_rolling:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.dice_roll_time > 1000:  # Roll for 1 second
+            self.dice_steps += 1
+            if self.dice_steps >= DICE_ROLL_STEPS:
                 self.dice_rolling = False
-                self.dice_value = random.randint(1, 6)
+                self.dice_value = self.engine.roll()
+                if self.net is not None:
+                    self.share_roll()
+                if self.replay is not None:
+                    self.replay.record(self.dice_value)
                 self.start_move_animation()
             else:
                 self.dice_value = random.randint(1, 6)
 
+    def share_roll(self):
+        # Every peer draws the same dice from the shared seed; the roller
+        # announces it and the others check they drew the same value
+        if self.remote_dice is None:
+            self.net.send_roll(self.engine.turn, self.dice_value, self.engine.state_hash())
+        elif self.remote_dice != self.dice_value:
+            self.net.report_desync(f"dice differ at turn {self.engine.turn}")
+        self.remote_dice = None
+
+    def poll_network(self):
+        # Start showing a roll another peer made for the turn we are on
+        if self.dice_rolling or self.moving_animation or self.winner is not None:
+            return
+        dice = self.net.take_roll(self.engine.turn, self.engine.state_hash())
+        if dice is not None:
+            self.remote_dice = dice
+            self.roll_dice()
+        else:
+            self.skip_departed()
+
+    def skip_departed(self):
+        # Seats that left are passed over, and the last seat still playing
+        # wins. Every peer has seen all of a seat's rolls before it learns
+        # that seat left, so they all skip at the same turn
+        departed = self.net.departed()
+        if self.current_player not in departed:
+            return
+        self.replay = None  # A replay is only dice; it cannot record a skipped seat
+        remaining = [seat for seat in range(len(self.players)) if seat not in departed]
+        if len(remaining) < 2:
+            self.winner = remaining[0]  # Our own seat never leaves
+            self.end_game()
+            return
+        while self.current_player in departed:
+            self.next_player_turn()
+
+    def network_status(self):
+        if self.net is None:
+            return None
+        if self.net.desync is not None:
+            return "Desync: " + self.net.desync
+        if self.net.closed:
+            return "Disconnected"
+        if self.winner is None and not self.dice_rolling and not self.moving_animation:
+            waiting = self.net.waiting_for(self.engine.turn)
+            if waiting:
+                return "Waiting for " + ", ".join(self.players[seat].name for seat in waiting)
+            if self.current_player != self.net.seat:
+                return f"{self.players[self.current_player].name} to roll"
+        return None
+
     def start_move_animation(self):
-        player = self.players[self.current_player]
-        old_position = player["position"]
-        new_position = old_position + self.dice_value
-        
-        if new_position > 100:
-            new_position = old_position  # Can't move beyond 100
-        
-        # Create animation path
-        self.animation_path = []
-        for pos in range(old_position, new_position + 1):
-            self.animation_path.append(pos)
-        
-        # Check for snakes and ladders at the end position
-        if new_position in self.snakes:
-            self.animation_path.append(self.snakes[new_position])
-        elif new_position in self.ladders:
-            self.animation_path.append(self.ladders[new_position])
+        # The engine decides the whole move; we only animate along its path
+        self.pending_move = self.engine.plan_move(self.dice_value)
+        self.animation_path = self.pending_move.path
+        self.occupancy.remove(self.pending_move.player_index, self.pending_move.start)
         
         if len(self.animation_path) > 1:  # Only animate if there's movement
             self.moving_animation = True
             self.animation_index = 1  # Start from the second position (after current)
-            self.animation_start_time = pygame.time.get_ticks()
+            self.animation_steps = 0
             move_sound.play()
         else:
-            self.next_player_turn()
+            self.finish_move()
 
     def update_animation(self):
+        # One simulation step of the token's move
         if self.moving_animation:
-            current_time = pygame.time.get_ticks()
+            self.animation_steps += 1
             
-            # Move to next position every 300ms
-            if current_time - self.animation_start_time > 300:
-                player = self.players[self.current_player]
-                
-                # Update player position
-                player["position"] = self.animation_path[self.animation_index]
-                
-                # Check for snake or ladder
+            # Move to next position every MOVE_STEPS steps; the engine only
+            # learns about the move once it is committed
+            if self.animation_steps >= MOVE_STEPS:
+                # Play the snake or ladder sound just before the jump
                 if self.animation_index == len(self.animation_path) - 2:
-                    current_pos = self.animation_path[self.animation_index]
-                    next_pos = self.animation_path[self.animation_index + 1]
-                    
-                    if current_pos in self.snakes and self.snakes[current_pos] == next_pos:
+                    if self.pending_move.jump == "snake":
                         snake_sound.play()
-                    elif current_pos in self.ladders and self.ladders[current_pos] == next_pos:
+                    elif self.pending_move.jump == "ladder":
                         ladder_sound.play()
                 
                 self.animation_index += 1
-                self.animation_start_time = current_time
+                self.animation_steps = 0
                 
                 # End of animation
                 if self.animation_index >= len(self.animation_path):
                     self.moving_animation = False
-                    
-                    # Check for winner
-                    if player["position"] == 100:
-                        self.winner = self.current_player
-                        win_sound.play()
-                        self.game_state = "game_over"
-                    else:
-                        self.next_player_turn()
+                    self.finish_move()
+
+    def moving_cell(self):
+        # Cell of the path the moving token has reached; until the move is
+        # committed the engine still has the player on the start cell
+        return self.animation_path[min(self.animation_index, len(self.animation_path)) - 1]
+
+    def finish_move(self):
+        # Commit the move in the engine and react to a win
+        move, self.pending_move = self.pending_move, None
+        self.engine.commit_move(move)
+        self.occupancy.add(move.player_index, move.end)
+        if self.net is not None:
+            self.net.send_ack(self.engine.turn, self.engine.state_hash())
+        if self.winner is not None:
+            self.end_game()
+
+    def end_game(self):
+        win_sound.play()
+        self.game_state = "game_over"
+        self.game_over_time = pygame.time.get_ticks()
+        self.games_finished += 1
+        self.turns_finished += self.engine.turn
+        if self.replay is not None and self.replay_path:
+            # Named after the match's seed, so no match, in this run or an
+            # earlier one, overwrites another's replay
+            stem, extension = os.path.splitext(self.replay_path)
+            self.replay.save(f"{stem}-{self.engine.seed}{extension}")
 
     def next_player_turn(self):
-        self.current_player = (self.current_player + 1) % len(self.players)
-
-    def draw_board(self):
-        # Draw board background
-        board_rect = pygame.Rect(
-            (SCREEN_WIDTH - BOARD_SIZE) // 2,
-            (SCREEN_HEIGHT - BOARD_SIZE) // 2,
-            BOARD_SIZE,
-            BOARD_SIZE
-        )
-        pygame.draw.rect(screen, BOARD_COLOR, board_rect)
-        pygame.draw.rect(screen, BLACK, board_rect, 2)
-
-        # Draw grid cells with alternating colors
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                cell_x = board_rect.left + col * CELL_SIZE
-                cell_y = board_rect.top + row * CELL_SIZE
-                
-                # Alternating cell colors
-                if (row + col) % 2 == 0:
-                    cell_color = (230, 230, 230)
-                else:
-                    cell_color = (210, 210, 210)
-                
-                pygame.draw.rect(screen, cell_color, (cell_x, cell_y, CELL_SIZE, CELL_SIZE))
-                pygame.draw.rect(screen, GRID_COLOR, (cell_x, cell_y, CELL_SIZE, CELL_SIZE), 1)
-
-        # Draw snakes
-        for start, end in self.snakes.items():
-            start_pos = self.board_positions[start]
-            end_pos = self.board_positions[end]
-            
-            # Calculate control points for curved line
-            control_x = (start_pos[0] + end_pos[0]) / 2 + random.randint(-50, 50)
-            control_y = (start_pos[1] + end_pos[1]) / 2 + random.randint(-50, 50)
-            
-            # Draw snake body (curved line)
-            points = []
-            for t in range(0, 101, 5):
-                t = t / 100
-                # Quadratic Bezier curve
-                x = (1-t)**2 * start_pos[0] + 2*(1-t)*t*control_x + t**2 * end_pos[0]
-                y = (1-t)**2 * start_pos[1] + 2*(1-t)*t*control_y + t**2 * end_pos[1]
-                points.append((x, y))
-            
-            if len(points) > 1:
-                pygame.draw.lines(screen, SNAKE_COLOR, False, points, 5)
-            
-            # Draw snake head
-            pygame.draw.circle(screen, SNAKE_COLOR, start_pos, 10)
-            
-            # Draw snake tail
-            pygame.draw.circle(screen, (200, 0, 0), end_pos, 7)
-
-        # Draw ladders
-        for start, end in self.ladders.items():
-            start_pos = self.board_positions[start]
-            end_pos = self.board_positions[end]
-            
-            # Calculate ladder width
-            ladder_width = 10
-            
-            # Calculate perpendicular vector for ladder sides
-            dx = end_pos[0] - start_pos[0]
-            dy = end_pos[1] - start_pos[1]
-            length = (dx**2 + dy**2)**0.5
-            
-            if length > 0:
-                perpx = -dy / length * ladder_width / 2
-                perpy = dx / length * ladder_width / 2
-                
-                # Draw ladder sides
-                pygame.draw.line(screen, LADDER_COLOR, 
-                               (start_pos[0] + perpx, start_pos[1] + perpy),
-                               (end_pos[0] + perpx, end_pos[1] + perpy), 3)
-                pygame.draw.line(screen, LADDER_COLOR, 
-                               (start_pos[0] - perpx, start_pos[1] - perpy),
-                               (end_pos[0] - perpx, end_pos[1] - perpy), 3)
-                
-                # Draw ladder rungs
-                num_rungs = int(length / 30)
-                for i in range(1, num_rungs + 1):
-                    t = i / (num_rungs + 1)
-                    rung_x1 = start_pos[0] + dx * t + perpx
-                    rung_y1 = start_pos[1] + dy * t + perpy
-                    rung_x2 = start_pos[0] + dx * t - perpx
-                    rung_y2 = start_pos[1] + dy * t - perpy
-                    pygame.draw.line(screen, LADDER_COLOR, (rung_x1, rung_y1), (rung_x2, rung_y2), 2)
-
-        # Draw numbers
-        for i in range(1, 101):
-            pos = self.board_positions[i]
-            
-            # Highlight special cells
-            if i in self.snakes:
-                pygame.draw.circle(screen, (255, 200, 200), pos, 15)
-            elif i in self.ladders:
-                pygame.draw.circle(screen, (200, 255, 200), pos, 15)
-            
-            num_text = font_small.render(str(i), True, BLACK)
-            num_rect = num_text.get_rect(center=pos)
-            screen.blit(num_text, num_rect)
+        self.engine.next_player_turn()
+
+    def leave_board(self):
+        # Back to the main menu. Nothing may keep the menu from going idle,
+        # and an online match is left for good: the relay tells the other
+        # peers, and the next game from Setup is a local one
+        self.stop_animations()
+        if self.net is not None:
+            self.net.close()
+            self.net = None
+        self.game_state = "menu"
+
+    def stop_animations(self):
+        # Drop a roll or move in progress, e.g. when the board is left mid-turn
+        self.dice_rolling = False
+        self.moving_animation = False
+        self.pending_move = None
+        self.remote_dice = None
+
+    def start_game(self, seed=None):
+        # Fresh positions; anything left over from an abandoned game is dropped
+        self.stop_animations()
+        self.engine.reset(seed=random.randrange(2 ** 63) if seed is None else seed)
+        self.replay = Replay.for_engine(self.engine)
+        self.occupancy.rebuild(self.players.positions)
+        self.win_chances_key = None
+        passage_table(self.snakes, self.ladders, self.engine.last_cell, wait=False)  # Odds show once it is built
+        self.dice_value = 1
+        self.game_state = "game"
+
+    def draw_board(self, surface, keyframe=0):
+        # Static board under the game's camera. Only called when the cached
+        # background is (re)built, never once per frame
+        if self.jump_index is None:
+            self.jump_index = build_jump_index(self.snakes, self.ladders, self.grid_size)
+        if self.snake_paths is None:
+            self.snake_paths = SnakePaths(self.snakes, self.grid_size)
+        render_board(surface, self.snakes, self.ladders, self.camera, keyframe, self.jump_index, self.snake_paths)
 
     def draw_players(self):
-        for i, player in enumerate(self.players):
-            pos = self.board_positions[player["position"]]
-            
-            # Add offset to prevent overlapping
-            offset_x = (i - len(self.players)/2 + 0.5) * (PLAYER_SIZE * 0.7)
-            offset_y = (i - len(self.players)/2 + 0.5) * (PLAYER_SIZE * 0.3)
-            player_pos = (pos[0] + offset_x, pos[1] + offset_y)
-            
-            # Draw player token
-            token = self.player_tokens[player["token_index"]]
-            token_rect = token.get_rect(center=player_pos)
-            screen.blit(token, token_rect)
+        # Scrolling boards keep tokens inside the board view
+        scrolls = self.board_scrolls()
+        if scrolls:
+            screen.set_clip(pygame.Rect(self.camera.viewport))
+        
+        if self.occupancy.count + (self.pending_move is not None) != len(self.players):
+            self.occupancy.rebuild(self.players.positions)  # Seats changed outside a move
+        
+        # Resting tokens are stacked per cell, each stack laid out once
+        records = self.players.records
+        token_rects = render_tokens(screen, self.camera, self.occupancy,
+                                    lambda seat: (self.player_token(records[seat].token_index), None))
+        
+        # The moving token is drawn on top, between the cells it moves across
+        if self.pending_move is not None:
+            seat = self.pending_move.player_index
+            wx, wy = self.moving_token_position()
+            if not scrolls or self.camera.contains(wx, wy, margin=1):
+                token = self.player_token(records[seat].token_index)
+                x, y = self.camera.to_screen(wx, wy)
+                token_rect = token.get_rect(center=(int(round(x)), int(round(y))))
+                screen.blit(token, token_rect)
+                token_rects.append(token_rect)
+        
+        if scrolls:
+            screen.set_clip(None)
+        return token_rects
 
     def draw_dice(self):
-        dice_x = SCREEN_WIDTH - DICE_SIZE - 40
-        dice_y = (SCREEN_HEIGHT - DICE_SIZE) // 2
-        dice_rect = pygame.Rect(dice_x, dice_y, DICE_SIZE, DICE_SIZE)
+        dice_rect = LAYOUTS["game"]["dice"]
+        dice_x, dice_y = dice_rect.topleft
         
         # Draw dice label
-        label = font_medium.render("DICE", True, BLACK)
+        label = text_cache.render(font_medium, "DICE", True, BLACK)
         screen.blit(label, (dice_x + DICE_SIZE//2 - label.get_width()//2, dice_y - 40))
         
         # Draw dice
@@ -403,15 +798,25 @@ class EnhancedSnakeAndLadderGame:
             screen.blit(self.dice_images[self.dice_value - 1], dice_rect)
         
         # Draw roll button
-        roll_button = pygame.Rect(dice_x, dice_y + DICE_SIZE + 20, DICE_SIZE, 40)
-        button_color = GREEN if not self.dice_rolling and not self.moving_animation else GRAY
+        roll_button = LAYOUTS["game"]["roll"]
+        button_color = GREEN if self.can_roll() else GRAY
         pygame.draw.rect(screen, button_color, roll_button)
         pygame.draw.rect(screen, BLACK, roll_button, 2)
         
-        roll_text = font_small.render("Roll Dice", True, BLACK)
+        roll_text = text_cache.render(font_small, "Roll Dice", True, BLACK)
         roll_text_rect = roll_text.get_rect(center=roll_button.center)
         screen.blit(roll_text, roll_text_rect)
         
+        # Online play: whose move the game is waiting on, or a desync warning
+        status = self.network_status()
+        if status is not None:
+            status_rect = LAYOUTS["game"]["status"]
+            color = RED if status.startswith(("Desync", "Disconnected")) else BLACK
+            while len(status) > 4 and font_small.size(status)[0] > status_rect.width:
+                status = status[:-4] + "..."
+            status_text = text_cache.render(font_small, status, True, color)
+            screen.blit(status_text, status_text.get_rect(midtop=status_rect.midtop))
+        
         return dice_rect, roll_button
 
     def draw_player_info(self):
@@ -419,12 +824,17 @@ class EnhancedSnakeAndLadderGame:
         info_y = 20
         
         # Draw game title
-        title = font_large.render("Snake and Ladders", True, BLUE)
-        screen.blit(title, (info_x, info_y))
-        
-        # Draw player information
-        for i, player in enumerate(self.players):
-            y_pos = info_y + 60 + i * 50
+        title = text_cache.render(font_large, "Snake and Ladders", True, BLUE)
+        drawn_rects = [screen.blit(title, (info_x, info_y))]
+        
+        # Draw player information; with more players than rows only a window
+        # around the current player is rendered
+        first, last = self.player_info_window()
+        positions = self.players.positions
+        chances = self.get_win_chances()
+        for row, i in enumerate(range(first, last)):
+            player = self.players[i]
+            y_pos = info_y + 60 + row * INFO_ROW_HEIGHT
             
             # Highlight current player
             if i == self.current_player:
@@ -432,81 +842,108 @@ class EnhancedSnakeAndLadderGame:
                 pygame.draw.rect(screen, BLACK, (info_x - 5, y_pos - 5, 250, 40), 1)
             
             # Draw player token
-            token = self.player_tokens[player["token_index"]]
+            token = self.player_token(player.token_index)
             screen.blit(token, (info_x, y_pos))
+            drawn_rects.append(pygame.Rect(info_x - 5, y_pos - 5, 250, 40))
             
             # Draw player name and position
-            name_text = font_medium.render(f"{player['name']}", True, player["color"])
-            screen.blit(name_text, (info_x + 40, y_pos))
+            name_text = text_cache.render(font_medium, f"{player.name}", True, player.color)
+            drawn_rects.append(screen.blit(name_text, (info_x + 40, y_pos)))
+            
+            cell = positions[i]
+            if self.pending_move is not None and i == self.pending_move.player_index:
+                cell = self.moving_cell()
+            pos_text = text_cache.render(font_small, f"Position: {cell}", True, BLACK)
+            pos_rect = screen.blit(pos_text, (info_x + 40, y_pos + 25))
+            drawn_rects.append(pos_rect)
             
-            pos_text = font_small.render(f"Position: {player['position']}", True, BLACK)
-            screen.blit(pos_text, (info_x + 40, y_pos + 25))
+            if chances is not None:
+                chance_text = text_cache.render(font_small, f"Win {chances[i]:.0%}", True, (80, 80, 80))
+                drawn_rects.append(screen.blit(chance_text, (pos_rect.right + 10, y_pos + 25)))
         
         # Draw menu button
-        menu_button = pygame.Rect(info_x, SCREEN_HEIGHT - 60, 120, 40)
+        menu_button = LAYOUTS["game"]["menu"]
         pygame.draw.rect(screen, ORANGE, menu_button)
         pygame.draw.rect(screen, BLACK, menu_button, 2)
         
-        menu_text = font_small.render("Main Menu", True, BLACK)
+        menu_text = text_cache.render(font_small, "Main Menu", True, BLACK)
         menu_text_rect = menu_text.get_rect(center=menu_button.center)
         screen.blit(menu_text, menu_text_rect)
         
+        # Remember the area we cover so dirty-rect frames can repaint it
+        self.info_panel_rect = menu_button.unionall(drawn_rects)
+        
         return menu_button
 
+    def get_win_chances(self):
+        # Recomputed once per turn from the board's first-passage table. While
+        # a token moves the odds stand as they were when it was rolled for.
+        # None until the table is built, and for boards too big to tabulate
+        if self.winner is not None:
+            return None
+        positions = self.players.positions
+        key = (positions.tobytes(), self.current_player)
+        if key != self.win_chances_key:
+            table = passage_table(self.snakes, self.ladders, self.engine.last_cell, wait=False)
+            if table is PASSAGE_PENDING:
+                return None  # Asked again next frame
+            self.win_chances = None if table is None else win_probabilities(table, positions, self.current_player)
+            self.win_chances_key = key
+        return self.win_chances
+
+    def player_info_window(self):
+        # Range of seats shown in the player panel, keeping the current one visible
+        count = len(self.players)
+        if count <= INFO_ROWS:
+            return 0, count
+        first = max(0, min(self.current_player - INFO_ROWS // 2, count - INFO_ROWS))
+        return first, first + INFO_ROWS
+
     def draw_menu(self):
         # Draw background
         screen.fill(BACKGROUND_COLOR)
         
         # Draw title
-        title = font_title.render("Snake and Ladders", True, BLUE)
+        title = text_cache.render(font_title, "Snake and Ladders", True, BLUE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
         screen.blit(title, title_rect)
         
         # Draw menu buttons
-        button_width = 200
-        button_height = 60
-        button_spacing = 20
-        start_y = 250
+        layout = LAYOUTS["menu"]
         
         # Play button
-        play_button = pygame.Rect(SCREEN_WIDTH//2 - button_width//2, start_y, button_width, button_height)
+        play_button = layout["play"]
         pygame.draw.rect(screen, GREEN, play_button)
         pygame.draw.rect(screen, BLACK, play_button, 2)
         
-        play_text = font_medium.render("Play Game", True, BLACK)
+        play_text = text_cache.render(font_medium, "Play Game", True, BLACK)
         play_text_rect = play_text.get_rect(center=play_button.center)
         screen.blit(play_text, play_text_rect)
         
         # Rules button
-        rules_button = pygame.Rect(SCREEN_WIDTH//2 - button_width//2, 
-                                 start_y + button_height + button_spacing, 
-                                 button_width, button_height)
+        rules_button = layout["rules"]
         pygame.draw.rect(screen, YELLOW, rules_button)
         pygame.draw.rect(screen, BLACK, rules_button, 2)
         
-        rules_text = font_medium.render("Game Rules", True, BLACK)
+        rules_text = text_cache.render(font_medium, "Game Rules", True, BLACK)
         rules_text_rect = rules_text.get_rect(center=rules_button.center)
         screen.blit(rules_text, rules_text_rect)
         
         # Credits button
-        credits_button = pygame.Rect(SCREEN_WIDTH//2 - button_width//2, 
-                                   start_y + 2 * (button_height + button_spacing), 
-                                   button_width, button_height)
+        credits_button = layout["credits"]
         pygame.draw.rect(screen, ORANGE, credits_button)
         pygame.draw.rect(screen, BLACK, credits_button, 2)
         
-        credits_text = font_medium.render("Credits", True, BLACK)
+        credits_text = text_cache.render(font_medium, "Credits", True, BLACK)
         credits_text_rect = credits_text.get_rect(center=credits_button.center)
         screen.blit(credits_text, credits_text_rect)
         
         # Quit button
-        quit_button = pygame.Rect(SCREEN_WIDTH//2 - button_width//2, 
-                                start_y + 3 * (button_height + button_spacing), 
-                                button_width, button_height)
+        quit_button = layout["quit"]
         pygame.draw.rect(screen, RED, quit_button)
         pygame.draw.rect(screen, BLACK, quit_button, 2)
         
-        quit_text = font_medium.render("Quit Game", True, BLACK)
+        quit_text = text_cache.render(font_medium, "Quit Game", True, BLACK)
         quit_text_rect = quit_text.get_rect(center=quit_button.center)
         screen.blit(quit_text, quit_text_rect)
         
@@ -553,21 +990,15 @@ class EnhancedSnakeAndLadderGame:
 
     def draw_rules(self):
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        screen.blit(overlay, (0, 0))
+        screen.blit(self.get_overlay(200), (0, 0))
         
         # Draw rules panel
-        panel_width = 700
-        panel_height = 500
-        panel = pygame.Rect(SCREEN_WIDTH//2 - panel_width//2, 
-                          SCREEN_HEIGHT//2 - panel_height//2,
-                          panel_width, panel_height)
+        panel = LAYOUTS["rules"]["panel"]
         pygame.draw.rect(screen, WHITE, panel)
         pygame.draw.rect(screen, BLACK, panel, 3)
         
         # Draw title
-        title = font_large.render("Game Rules", True, BLUE)
+        title = text_cache.render(font_large, "Game Rules", True, BLUE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, panel.top + 40))
         screen.blit(title, title_rect)
         
@@ -577,22 +1008,22 @@ class EnhancedSnakeAndLadderGame:
             "2. Players take turns rolling the dice and moving their token.",
             "3. If a player lands on the bottom of a ladder, they climb up to the top.",
             "4. If a player lands on the head of a snake, they slide down to the tail.",
-            "5. The first player to reach position 100 exactly wins the game.",
-            "6. If a player's move would take them beyond position 100, they stay in place.",
+            f"5. The first player to reach position {self.engine.last_cell} exactly wins the game.",
+            f"6. If a player's move would take them beyond position {self.engine.last_cell}, they stay in place.",
             "7. Click the 'Roll Dice' button on your turn to roll the dice.",
             "8. Watch for animations showing your movement on the board."
         ]
         
         for i, rule in enumerate(rules):
-            rule_text = font_small.render(rule, True, BLACK)
+            rule_text = text_cache.render(font_small, rule, True, BLACK)
             screen.blit(rule_text, (panel.left + 50, panel.top + 100 + i * 30))
         
         # Draw close button
-        close_button = pygame.Rect(SCREEN_WIDTH//2 - 60, panel.bottom - 60, 120, 40)
+        close_button = LAYOUTS["rules"]["close"]
         pygame.draw.rect(screen, RED, close_button)
         pygame.draw.rect(screen, BLACK, close_button, 2)
         
-        close_text = font_small.render("Close", True, BLACK)
+        close_text = text_cache.render(font_small, "Close", True, BLACK)
         close_text_rect = close_text.get_rect(center=close_button.center)
         screen.blit(close_text, close_text_rect)
         
@@ -600,21 +1031,15 @@ class EnhancedSnakeAndLadderGame:
 
     def draw_credits(self):
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        screen.blit(overlay, (0, 0))
+        screen.blit(self.get_overlay(200), (0, 0))
         
         # Draw credits panel
-        panel_width = 600
-        panel_height = 400
-        panel = pygame.Rect(SCREEN_WIDTH//2 - panel_width//2, 
-                          SCREEN_HEIGHT//2 - panel_height//2,
-                          panel_width, panel_height)
+        panel = LAYOUTS["credits"]["panel"]
         pygame.draw.rect(screen, WHITE, panel)
         pygame.draw.rect(screen, BLACK, panel, 3)
         
         # Draw title
-        title = font_large.render("Credits", True, BLUE)
+        title = text_cache.render(font_large, "Credits", True, BLUE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, panel.top + 40))
         screen.blit(title, title_rect)
         
@@ -632,16 +1057,16 @@ class EnhancedSnakeAndLadderGame:
         ]
         
         for i, line in enumerate(credits):
-            credit_text = font_small.render(line, True, BLACK)
+            credit_text = text_cache.render(font_small, line, True, BLACK)
             credit_rect = credit_text.get_rect(center=(SCREEN_WIDTH//2, panel.top + 100 + i * 30))
             screen.blit(credit_text, credit_rect)
         
         # Draw close button
-        close_button = pygame.Rect(SCREEN_WIDTH//2 - 60, panel.bottom - 60, 120, 40)
+        close_button = LAYOUTS["credits"]["close"]
         pygame.draw.rect(screen, RED, close_button)
         pygame.draw.rect(screen, BLACK, close_button, 2)
         
-        close_text = font_small.render("Close", True, BLACK)
+        close_text = text_cache.render(font_small, "Close", True, BLACK)
         close_text_rect = close_text.get_rect(center=close_button.center)
         screen.blit(close_text, close_text_rect)
         
@@ -652,23 +1077,23 @@ class EnhancedSnakeAndLadderGame:
         screen.fill(BACKGROUND_COLOR)
         
         # Draw title
-        title = font_large.render("Game Setup", True, BLUE)
+        title = text_cache.render(font_large, "Game Setup", True, BLUE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 80))
         screen.blit(title, title_rect)
         
         # Draw player count selection
-        count_text = font_medium.render("Select Number of Players:", True, BLACK)
+        count_text = text_cache.render(font_medium, "Select Number of Players:", True, BLACK)
         count_rect = count_text.get_rect(center=(SCREEN_WIDTH//2, 150))
         screen.blit(count_text, count_rect)
         
         count_buttons = []
         for i in range(2, 5):
-            button = pygame.Rect(SCREEN_WIDTH//2 - 150 + (i-2)*100, 200, 80, 60)
+            button = LAYOUTS["setup"][f"count_{i}"]
             color = GREEN if self.target_players == i else WHITE
             pygame.draw.rect(screen, color, button)
             pygame.draw.rect(screen, BLACK, button, 2)
             
-            text = font_large.render(str(i), True, BLACK)
+            text = text_cache.render(font_large, str(i), True, BLACK)
             text_rect = text.get_rect(center=button.center)
             screen.blit(text, text_rect)
             
@@ -676,58 +1101,58 @@ class EnhancedSnakeAndLadderGame:
         
         # Draw player name input section
         if self.target_players > 0:
-            input_text = font_medium.render(f"Enter Player {len(self.players) + 1} Name:", True, BLACK)
+            input_text = text_cache.render(font_medium, f"Enter Player {len(self.players) + 1} Name:", True, BLACK)
             input_rect = input_text.get_rect(center=(SCREEN_WIDTH//2, 300))
             screen.blit(input_text, input_rect)
             
             # Draw input box
-            input_box = pygame.Rect(SCREEN_WIDTH//2 - 150, 340, 300, 50)
+            input_box = LAYOUTS["setup"]["input"]
             color = BLUE if self.input_active else WHITE
             pygame.draw.rect(screen, color, input_box)
             pygame.draw.rect(screen, BLACK, input_box, 2)
             
-            text_surface = font_medium.render(self.input_text, True, BLACK)
+            text_surface = text_cache.render(font_medium, self.input_text, True, BLACK)
             screen.blit(text_surface, (input_box.x + 10, input_box.y + 10))
             
             # Draw add player button
-            add_button = pygame.Rect(SCREEN_WIDTH//2 - 100, 410, 200, 50)
+            add_button = LAYOUTS["setup"]["add"]
             add_color = GREEN if self.input_text and len(self.players) < self.target_players else GRAY
             pygame.draw.rect(screen, add_color, add_button)
             pygame.draw.rect(screen, BLACK, add_button, 2)
             
-            add_text = font_medium.render("Add Player", True, BLACK)
+            add_text = text_cache.render(font_medium, "Add Player", True, BLACK)
             add_text_rect = add_text.get_rect(center=add_button.center)
             screen.blit(add_text, add_text_rect)
             
             # Draw player list
             player_list_y = 480
             if len(self.players) > 0:
-                list_text = font_medium.render("Players:", True, BLACK)
+                list_text = text_cache.render(font_medium, "Players:", True, BLACK)
                 screen.blit(list_text, (SCREEN_WIDTH//2 - 150, player_list_y))
                 
                 for i, player in enumerate(self.players):
-                    token = self.player_tokens[player["token_index"]]
+                    token = self.player_token(player.token_index)
                     screen.blit(token, (SCREEN_WIDTH//2 - 150, player_list_y + 40 + i * 40))
                     
-                    player_text = font_medium.render(player["name"], True, player["color"])
+                    player_text = text_cache.render(font_medium, player.name, True, player.color)
                     screen.blit(player_text, (SCREEN_WIDTH//2 - 110, player_list_y + 40 + i * 40))
             
             # Draw start game button
-            start_button = pygame.Rect(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT - 100, 200, 60)
+            start_button = LAYOUTS["setup"]["start"]
             start_color = GREEN if len(self.players) == self.target_players else GRAY
             pygame.draw.rect(screen, start_color, start_button)
             pygame.draw.rect(screen, BLACK, start_button, 2)
             
-            start_text = font_medium.render("Start Game", True, BLACK)
+            start_text = text_cache.render(font_medium, "Start Game", True, BLACK)
             start_text_rect = start_text.get_rect(center=start_button.center)
             screen.blit(start_text, start_text_rect)
             
             # Draw back button
-            back_button = pygame.Rect(50, SCREEN_HEIGHT - 100, 120, 50)
+            back_button = LAYOUTS["setup"]["back"]
             pygame.draw.rect(screen, ORANGE, back_button)
             pygame.draw.rect(screen, BLACK, back_button, 2)
             
-            back_text = font_medium.render("Back", True, BLACK)
+            back_text = text_cache.render(font_medium, "Back", True, BLACK)
             back_text_rect = back_text.get_rect(center=back_button.center)
             screen.blit(back_text, back_text_rect)
             
@@ -735,20 +1160,60 @@ class EnhancedSnakeAndLadderGame:
         
         return count_buttons, None, None, None, None
 
+    def get_overlay(self, alpha):
+        # Full-screen translucent overlays are reused instead of allocated per frame
+        overlay = self.overlays.get(alpha)
+        if overlay is None:
+            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, alpha))
+            self.overlays[alpha] = overlay
+        return overlay
+
+    def get_pulse_frames(self):
+        # Pre-scaled "Congratulations!" text for one full pulse cycle
+        if self.pulse_frames is None:
+            congrats_text = text_cache.render(font_large, "Congratulations!", True, BLUE)
+            self.pulse_frames = []
+            for i in range(PULSE_FRAMES):
+                scale = 1.0 + math.sin(2 * math.pi * i / PULSE_FRAMES) * 0.1
+                self.pulse_frames.append(pygame.transform.scale(
+                    congrats_text,
+                    (int(congrats_text.get_width() * scale), int(congrats_text.get_height() * scale))))
+        return self.pulse_frames
+
+    def get_spin_frames(self, token_index):
+        # Enlarged winner token pre-rotated in 2 degree steps, built once per token
+        frames = self.spin_frames.get(token_index)
+        if frames is None:
+            token = pygame.transform.scale(self.player_token(token_index), (60, 60))
+            frames = [pygame.transform.rotate(token, angle) for angle in range(0, 360, 2)]
+            self.spin_frames[token_index] = frames
+        return frames
+
+    def get_game_over_scene(self):
+        # The finished board under the overlay and empty panel, composed once per result
+        key = (self.winner, len(self.players), self.players.positions.tobytes())
+        if self.game_over_scene is None or self.game_over_scene_key != key:
+            screen.blit(self.get_game_background(), (0, 0))
+            self.draw_players()
+            self.draw_dice()
+            self.draw_player_info()
+            
+            # Draw semi-transparent overlay
+            screen.blit(self.get_overlay(150), (0, 0))
+            
+            # Draw game over panel
+            panel = LAYOUTS["game_over"]["panel"]
+            pygame.draw.rect(screen, WHITE, panel)
+            pygame.draw.rect(screen, BLACK, panel, 3)
+            
+            self.game_over_scene = screen.copy()
+            self.game_over_scene_key = key
+        return self.game_over_scene
+
     def draw_game_over(self):
-        # Draw semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 150))
-        screen.blit(overlay, (0, 0))
-        
-        # Draw game over panel
-        panel_width = 500
-        panel_height = 300
-        panel = pygame.Rect(SCREEN_WIDTH//2 - panel_width//2, 
-                          SCREEN_HEIGHT//2 - panel_height//2,
-                          panel_width, panel_height)
-        pygame.draw.rect(screen, WHITE, panel)
-        pygame.draw.rect(screen, BLACK, panel, 3)
+        screen.blit(self.get_game_over_scene(), (0, 0))
+        panel = LAYOUTS["game_over"]["panel"]
         
         # Draw winner information with celebration effects
         winner = self.players[self.winner]
@@ -761,43 +1226,52 @@ class EnhancedSnakeAndLadderGame:
             color = PLAYER_COLORS[i % len(PLAYER_COLORS)]
             pygame.draw.circle(screen, color, (x, y), 5)
         
-        # Animated congratulations text
-        scale = 1.0 + math.sin(current_time * 0.2) * 0.1  # Pulsing effect
-        congrats_text = font_large.render("Congratulations!", True, BLUE)
-        congrats_text = pygame.transform.scale(congrats_text, 
-                                             (int(congrats_text.get_width() * scale), 
-                                              int(congrats_text.get_height() * scale)))
+        # Animated congratulations text (pulsing effect)
+        phase = current_time * 0.2 / (2 * math.pi)
+        congrats_text = self.get_pulse_frames()[int(phase * PULSE_FRAMES) % PULSE_FRAMES]
         congrats_rect = congrats_text.get_rect(center=(SCREEN_WIDTH//2, panel.top + 60))
         screen.blit(congrats_text, congrats_rect)
         
         # Animated winner text
-        winner_text = font_large.render(f"{winner['name']} Wins!", True, winner["color"])
+        winner_text = text_cache.render(font_large, f"{winner.name} Wins!", True, winner.color)
         winner_rect = winner_text.get_rect(center=(SCREEN_WIDTH//2, panel.top + 120))
         screen.blit(winner_text, winner_rect)
         
         # Animated winner token with rotation
-        token = pygame.transform.scale(self.player_tokens[winner["token_index"]], (60, 60))
-        token = pygame.transform.rotate(token, current_time * 2)  # Rotating effect
+        spin_frames = self.get_spin_frames(winner.token_index)
+        token = spin_frames[current_time % len(spin_frames)]  # Rotating effect
         token_rect = token.get_rect(center=(SCREEN_WIDTH//2, panel.top + 180))
         screen.blit(token, token_rect)
         
         # Draw only the main menu button
-        menu_button = pygame.Rect(SCREEN_WIDTH//2 - 80, panel.bottom - 60, 160, 50)
+        menu_button = LAYOUTS["game_over"]["menu"]
         pygame.draw.rect(screen, ORANGE, menu_button)
         pygame.draw.rect(screen, BLACK, menu_button, 2)
         
-        menu_text = font_medium.render("Main Menu", True, BLACK)
+        menu_text = text_cache.render(font_medium, "Main Menu", True, BLACK)
         menu_rect = menu_text.get_rect(center=menu_button.center)
         screen.blit(menu_text, menu_rect)
         
         return menu_button
 
-    def handle_events(self):
-        for event in pygame.event.get():
+    def is_animating(self):
+        # True while something on screen changes without user input
+        return (self.dice_rolling or self.moving_animation or self.game_state == "game_over"
+                or self.bot_to_roll())
+
+    def handle_events(self, events=None):
+        if events is None:
+            events = pygame.event.get()
+        for event in events:
             if event.type == QUIT:
                 pygame.quit()
                 sys.exit()
             
+            elif event.type == KEYDOWN and event.key in (K_F3, K_F4):
+                if event.key == K_F3:
+                    profiler.toggle_overlay()
+                elif profiler.enabled:
+                    print("Frame profile written to " + " and ".join(profiler.export()))
             elif event.type == KEYDOWN:
                 if self.game_state == "setup" and self.input_active:
                     if event.key == K_RETURN:
@@ -810,93 +1284,300 @@ class EnhancedSnakeAndLadderGame:
                         # Limit name length
                         if len(self.input_text) < 15:
                             self.input_text += event.unicode
+                
+                elif self.game_state == "game" and event.key in PAN_KEYS:
+                    # Arrow keys scroll large boards by a quarter of the view
+                    dx, dy = PAN_KEYS[event.key]
+                    view_w, view_h = self.camera.view_size()
+                    self.camera.pan(dx * view_w / 4, dy * view_h / 4)
+            
+            elif event.type == MOUSEWHEEL:
+                if self.game_state == "game":
+                    anchor = pygame.mouse.get_pos()
+                    if not pygame.Rect(self.camera.viewport).collidepoint(anchor):
+                        anchor = None
+                    self.camera.zoom(ZOOM_STEP ** event.y, anchor)
+            
+            elif event.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+                self.needs_full_redraw = True
             
             elif event.type == MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                
-                if self.game_state == "menu":
-                    if self.show_rules:
-                        close_button = self.draw_rules()
-                        if close_button.collidepoint(mouse_pos):
-                            self.show_rules = False
-                    elif self.show_credits:
-                        close_button = self.draw_credits()
-                        if close_button.collidepoint(mouse_pos):
-                            self.show_credits = False
-                    else:
-                        play_button, rules_button, credits_button, quit_button = self.draw_menu()
-                        
-                        if play_button.collidepoint(mouse_pos):
-                            self.game_state = "setup"
-                            self.target_players = 0
-                            self.players = []
-                        elif rules_button.collidepoint(mouse_pos):
-                            self.show_rules = True
-                        elif credits_button.collidepoint(mouse_pos):
-                            self.show_credits = True
-                        elif quit_button.collidepoint(mouse_pos):
-                            pygame.quit()
-                            sys.exit()
-                
-                elif self.game_state == "setup":
-                    count_buttons, input_box, add_button, start_button, back_button = self.draw_setup()
-                    
-                    # Handle player count selection
-                    for i, button in enumerate(count_buttons):
-                        if button.collidepoint(mouse_pos):
-                            self.target_players = i + 2
-                            self.players = []
-                            self.input_text = ""
-                            break
-                    
-                    if input_box and input_box.collidepoint(mouse_pos):
-                        self.input_active = True
-                    else:
-                        self.input_active = False
-                    
-                    if add_button and add_button.collidepoint(mouse_pos) and self.input_text and len(self.players) < self.target_players:
-                        self.add_player(self.input_text)
-                        self.input_text = ""
-                    
-                    if start_button and start_button.collidepoint(mouse_pos) and len(self.players) == self.target_players:
-                        self.game_state = "game"
-                        self.current_player = 0
-                        self.winner = None
-                    
-                    if back_button and back_button.collidepoint(mouse_pos):
-                        self.game_state = "menu"
-                
-                elif self.game_state == "game":
-                    if self.winner is not None:
-                        play_again_button, menu_button = self.draw_game_over()
-                        
-                        if play_again_button.collidepoint(mouse_pos):
-                            # Reset game with same players
-                            for player in self.players:
-                                player["position"] = 1
-                            self.current_player = 0
-                            self.winner = None
-                            self.dice_value = 1
-                        
-                        elif menu_button.collidepoint(mouse_pos):
-                            self.game_state = "menu"
-                    
-                    else:
-                        dice_rect, roll_button = self.draw_dice()
-                        menu_button = self.draw_player_info()
-                        
-                        if roll_button.collidepoint(mouse_pos) and not self.dice_rolling and not self.moving_animation:
-                            self.roll_dice()
-                        
-                        if menu_button.collidepoint(mouse_pos):
-                            self.game_state = "menu"
+                if event.button in (4, 5):
+                    continue  # Wheel scrolling is handled as MOUSEWHEEL
+                self.handle_click(self.hit_test(event.pos))
+
+    def current_layout(self):
+        # Name of the layout that currently receives clicks
+        if self.game_state == "menu":
+            if self.show_rules:
+                return "rules"
+            if self.show_credits:
+                return "credits"
+            return "menu"
+        if self.game_state == "game" and self.winner is not None:
+            return "game_over"  # Winner decided, celebration not started yet
+        return self.game_state
+
+    def hit_test(self, pos):
+        # Return the name of the widget under pos, or None
+        layout = self.current_layout()
+        for name, rect in LAYOUTS[layout].items():
+            if name == "panel":
+                continue
+            # Setup widgets below the player count only exist once it is chosen
+            if layout == "setup" and not name.startswith("count_") and self.target_players == 0:
+                continue
+            if rect.collidepoint(pos):
+                return name
+        return None
+
+    def handle_click(self, widget):
+        layout = self.current_layout()
+        
+        if layout == "rules":
+            if widget == "close":
+                self.show_rules = False
+        
+        elif layout == "credits":
+            if widget == "close":
+                self.show_credits = False
+        
+        elif layout == "menu":
+            if widget == "play":
+                self.game_state = "setup"
+                self.target_players = 0
+                self.players.clear()
+            elif widget == "rules":
+                self.show_rules = True
+            elif widget == "credits":
+                self.show_credits = True
+            elif widget == "quit":
+                pygame.quit()
+                sys.exit()
+        
+        elif layout == "setup":
+            # Handle player count selection
+            if widget is not None and widget.startswith("count_"):
+                self.target_players = int(widget[len("count_"):])
+                self.players.clear()
+                self.input_text = ""
+            
+            self.input_active = widget == "input"
+            
+            if widget == "add" and self.input_text and len(self.players) < self.target_players:
+                self.add_player(self.input_text)
+                self.input_text = ""
+            
+            elif widget == "start" and len(self.players) == self.target_players:
+                self.start_game()
+            
+            elif widget == "back":
+                self.game_state = "menu"
+        
+        elif layout == "game":
+            if widget == "roll" and self.can_roll():
+                self.roll_dice()
+            elif widget == "menu":
+                self.leave_board()
+        
+        elif layout == "game_over":
+            if widget == "menu":
+                self.leave_board()
 
     def update(self):
         if self.game_state == "game":
+            if self.net is not None:
+                self.poll_network()
+            if self.bot_to_roll():
+                self.roll_dice()
+            if self.turbo:
+                # The whole roll and move in this one update, through the
+                # same steps as real play
+                while (self.dice_rolling or self.moving_animation) and self.game_state == "game":
+                    self.step()
+                return
+            # Run every step that is due, however long the last frame took
+            for _ in range(self.timestep.advance(pygame.time.get_ticks())):
+                if not (self.dice_rolling or self.moving_animation) or self.game_state != "game":
+                    break
+                self.step()
+        
+        elif self.game_state == "game_over" and self.all_bots():
+            # Attract mode: bots start a new game once the win has been shown
+            if self.turbo or pygame.time.get_ticks() - self.game_over_time >= ATTRACT_RESTART_MS:
+                self.start_game()
+
+    def step(self):
+        # One fixed simulation step of whatever is animating
+        if self.dice_rolling:
             self.update_dice()
+        else:
             self.update_animation()
 
+    def bot_to_roll(self):
+        return (self.game_state == "game" and self.winner is None
+                and self.current_player in self.bots and self.can_roll())
+
+    def all_bots(self):
+        return len(self.players) > 0 and self.net is None and all(
+            seat in self.bots for seat in range(len(self.players)))
+
+    def moving_token_position(self):
+        # World position of the moving token, part way between the cell it
+        # last reached and the next one on its path
+        x0, y0 = cell_center(self.moving_cell(), self.grid_size)
+        if not self.moving_animation or self.animation_index >= len(self.animation_path):
+            return x0, y0
+        x1, y1 = cell_center(self.animation_path[self.animation_index], self.grid_size)
+        t = min(1.0, (self.animation_steps + self.timestep.alpha()) / MOVE_STEPS)
+        return x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+
+    def get_game_background(self):
+        # Bake the static board once; rebuild only if snakes or ladders change
+        board_changed = self.baked_snakes != self.snakes or self.baked_ladders != self.ladders
+        if board_changed:
+            self.jump_index = None
+            self.snake_paths = None
+        if self.game_background is None or board_changed or self.baked_camera != self.camera.state():
+            if self.game_background is None:
+                self.game_background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+            keyframe = self.wiggle_keyframe()
+            self.game_background.fill(BACKGROUND_COLOR)
+            self.draw_board(self.game_background, keyframe)
+            self.baked_snakes = dict(self.snakes)
+            self.baked_ladders = dict(self.ladders)
+            self.baked_camera = self.camera.state()
+            self.background_keyframe = keyframe
+            self.wiggle_rects = self.get_wiggle_rects()
+            self.wiggle_patches = {keyframe: [self.game_background.subsurface(rect).copy()
+                                              for rect in self.wiggle_rects]}
+            self.needs_full_redraw = True
+        return self.game_background
+
+    def wiggle_keyframe(self):
+        return pygame.time.get_ticks() // WIGGLE_FRAME_MS % WIGGLE_KEYFRAMES
+
+    def get_wiggle_rects(self):
+        # Screen rects around the visible snakes, big enough for every keyframe
+        viewport = pygame.Rect(self.camera.viewport)
+        pad = max(2, round(10 * self.camera.cell_size / CELL_SIZE)) + 2  # Head radius and line width
+        rects = []
+        for kind, start in sorted(self.jump_index.query(*self.camera.visible_world_rect())):
+            if kind != "snake":
+                continue
+            left, top, right, bottom = self.snake_paths.bounds(start)
+            (x0, y0), (x1, y1) = self.camera.to_screen(left, top), self.camera.to_screen(right, bottom)
+            rect = pygame.Rect(int(x0) - pad, int(y0) - pad, int(x1 - x0) + 2 * pad + 1, int(y1 - y0) + 2 * pad + 1)
+            rect = rect.clip(viewport)
+            if rect:
+                rects.append(rect)
+        return rects
+
+    def advance_wiggle(self):
+        # Patch the background over to the current keyframe and return the
+        # rects that changed; a keyframe seen before costs only the blits
+        keyframe = self.wiggle_keyframe()
+        if keyframe == self.background_keyframe or not self.wiggle_rects:
+            return []
+        patches = self.wiggle_patches.get(keyframe)
+        if patches is None:
+            if self.wiggle_scratch is None:
+                self.wiggle_scratch = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+            self.wiggle_scratch.fill(BACKGROUND_COLOR)
+            self.draw_board(self.wiggle_scratch, keyframe)
+            patches = [self.wiggle_scratch.subsurface(rect).copy() for rect in self.wiggle_rects]
+            self.wiggle_patches[keyframe] = patches
+        for rect, patch in zip(self.wiggle_rects, patches):
+            self.game_background.blit(patch, rect)
+        self.background_keyframe = keyframe
+        return list(self.wiggle_rects)
+
+    def idle_wait_ms(self):
+        # How long the idle loop may sleep; during a game the snakes still
+        # wiggle, so it wakes up for each new keyframe
+        if self.game_state == "game" and self.snakes:
+            return WIGGLE_FRAME_MS - pygame.time.get_ticks() % WIGGLE_FRAME_MS
+        return IDLE_WAIT_MS
+
+    def follow_current_player(self):
+        # Scroll a large board so a moving token stays in view; the player is
+        # free to look around the rest of the time
+        if self.moving_animation and self.board_scrolls():
+            wx, wy = cell_center(self.moving_cell(), self.grid_size)
+            if not self.camera.contains(wx, wy, margin=-1):
+                self.camera.center_on(wx, wy)
+
+    def draw_game_frame(self):
+        self.follow_current_player()
+        background = self.get_game_background()
+        wiggled = self.advance_wiggle()
+        # Lifting the moving token out of its stack rearranges that stack too
+        positions = (self.players.positions.tobytes(),
+                     self.moving_token_position() if self.pending_move is not None else None)
+        dice_state = (self.dice_value, self.dice_rolling, self.moving_animation, self.network_status())
+        info_state = (positions, self.current_player, len(self.players), self.get_win_chances() is not None)
+        
+        if self.needs_full_redraw:
+            screen.blit(background, (0, 0))
+            self.token_rects = self.draw_players()
+            self.draw_dice()
+            self.draw_player_info()
+            self.needs_full_redraw = False
+            self.last_frame_state = (positions, dice_state, info_state)
+            pygame.display.flip()
+            return
+        
+        last_positions, last_dice_state, last_info_state = self.last_frame_state
+        
+        # Each layer is (region on screen, changed this frame)
+        layers = {
+            "snakes": [wiggled, bool(wiggled)],
+            "players": [list(self.token_rects), positions != last_positions],
+            "dice": [[self.dice_panel_rect], dice_state != last_dice_state or self.dice_rolling],
+            "info": [[self.info_panel_rect], info_state != last_info_state],
+        }
+        dirty = [rect for region, changed in layers.values() if changed for rect in region]
+        if not dirty:
+            return  # Nothing moved, keep the previous frame on screen
+        
+        # Layers overlapping a repainted area must be redrawn too
+        redraw = {name for name, (region, changed) in layers.items() if changed}
+        grown = True
+        while grown:
+            grown = False
+            for name, (region, changed) in layers.items():
+                if name not in redraw and any(rect.collidelist(dirty) != -1 for rect in region):
+                    redraw.add(name)
+                    dirty.extend(region)
+                    grown = True
+        
+        for rect in dirty:
+            screen.blit(background, rect, rect)
+        
+        # Redraw in the same order as a full frame
+        if "players" in redraw:
+            self.token_rects = self.draw_players()
+            dirty.extend(self.token_rects)
+        if "dice" in redraw:
+            self.draw_dice()
+        if "info" in redraw:
+            self.draw_player_info()
+            dirty.append(self.info_panel_rect)
+        
+        self.last_frame_state = (positions, dice_state, info_state)
+        pygame.display.update(dirty)
+
     def draw(self):
+        if self.turbo > 1 and self.game_state == "game" and self.engine.turn % self.turbo:
+            if self.current_player in self.bots:
+                return  # Turbo only shows every turbo-th turn, and any human's
+        
+        if self.game_state == "game" and self.winner is None:
+            self.draw_game_frame()
+            return
+        
+        # Any other screen repaints everything, so the next game frame must too
+        self.needs_full_redraw = True
         screen.fill(BACKGROUND_COLOR)
         
         if self.game_state == "menu":
@@ -912,26 +1593,168 @@ class EnhancedSnakeAndLadderGame:
         elif self.game_state == "setup":
             self.draw_setup()
         
-        elif self.game_state == "game":
-            self.draw_board()
-            self.draw_players()
-            self.draw_dice()
-            self.draw_player_info()
-            
-            if self.winner is not None:
-                self.draw_game_over()
+        elif self.game_state in ("game", "game_over"):
+            self.draw_game_over()
         
         pygame.display.flip()
 
+def join_online_game(args):
+    # Wait in the relay room until everyone is there, then start the shared game
+    host, _, port = args.connect.partition(":")
+    notify = lambda: pygame.event.post(pygame.event.Event(USEREVENT))  # Wakes the idle loop
+    session = LockstepSession(host or "127.0.0.1", int(port or LOCKSTEP_PORT), args.room,
+                              args.online_players, args.name, notify=notify)
+    print(f"Waiting for {args.online_players} players in room {args.room}...")
+    while not session.wait_for_start(0.05):
+        for event in pygame.event.get(QUIT):
+            session.close()
+            pygame.quit()
+            sys.exit()
+    
+    # Every peer must build the same board, so random layouts use the shared seed
+    if args.grid_size == GRID_SIZE:
+        engine = GameEngine()
+    else:
+        last_cell = args.grid_size * args.grid_size
+        snakes, ladders = random_layout(last_cell, seed=session.seed)
+        engine = GameEngine(snakes, ladders, last_cell=last_cell)
+    game = EnhancedSnakeAndLadderGame(engine=engine)
+    for name in session.names:
+        game.add_player(name)
+    game.net = session
+    game.start_game(seed=session.seed)
+    return game
+
 def main():
-    clock = pygame.time.Clock()
-    game = EnhancedSnakeAndLadderGame()
+    parser = argparse.ArgumentParser(description="Snake and Ladders")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE,
+                        help=f"cells per board side (2-{MAX_GRID_SIZE}); boards other than 10x10 get a random layout")
+    parser.add_argument("--seats", type=int, default=0,
+                        help=f"classroom mode: seat this many players (2-{MAX_PLAYERS}) and start straight away")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save each finished match as a replay (see replay.py), named PATH with the "
+                             "match's seed before the extension, e.g. match-1234.snlr")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="keep a snapshot of the running match in PATH and resume from it on start")
+    parser.add_argument("--connect", metavar="HOST[:PORT]",
+                        help=f"play online through a lockstep relay (see lockstep.py, default port {LOCKSTEP_PORT})")
+    parser.add_argument("--room", type=int, default=1, help="online room to join")
+    parser.add_argument("--online-players", type=int, default=2, help="players the online room waits for")
+    parser.add_argument("--name", default="Player", help="your name online")
+    parser.add_argument("--bots", type=int, default=0,
+                        help="with --seats, let the last BOTS seats roll for themselves; "
+                             "when every seat is a bot, games start over on their own")
+    parser.add_argument("--turbo", type=int, default=0, metavar="N",
+                        help="play each move in a single update, draw every Nth turn and mute sound")
+    parser.add_argument("--games", type=int, default=0,
+                        help="quit after this many finished games and print how fast they went")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="speed of dice and token animations (2 = twice as fast)")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="time every frame from the start and write PREFIX.csv and PREFIX.json on exit")
+    args = parser.parse_args()
+    if args.seats and not 2 <= args.seats <= MAX_PLAYERS:
+        parser.error(f"--seats must be between 2 and {MAX_PLAYERS}")
+    if args.time_scale <= 0:
+        parser.error("--time-scale must be positive")
+    if not 0 <= args.bots <= args.seats:
+        parser.error("--bots needs --seats and can be at most that many")
+    if args.turbo < 0:
+        parser.error("--turbo must not be negative")
+    
+    init_display()
+    game = None
+    checkpointer = None
+    if args.connect:
+        game = join_online_game(args)
+    elif args.checkpoint:
+        if os.path.exists(args.checkpoint):
+            try:
+                with SnapshotView(args.checkpoint) as snapshot:
+                    game = EnhancedSnakeAndLadderGame(engine=snapshot.engine())
+                    snapshot.apply(game)
+                # Restart the roll or step that was interrupted
+                game.timestep.reset(pygame.time.get_ticks())
+            except ValueError as error:
+                print(f"Ignoring checkpoint {args.checkpoint}: {error}")
+                game = None
+        checkpointer = Checkpointer(args.checkpoint)
+    
+    resumed = game is not None
+    if game is None:
+        game = EnhancedSnakeAndLadderGame(grid_size=args.grid_size)
+    game.replay_path = args.record
+    game.timestep.time_scale = args.time_scale
+    if args.seats and not resumed:
+        humans = args.seats - args.bots
+        for seat in range(args.seats):
+            game.add_player(f"Player {seat + 1}" if seat < humans else f"Bot {seat + 1}")
+        game.start_game()
+    game.bots = set(range(args.seats - args.bots, args.seats))
+    game.turbo = args.turbo
+    if args.turbo:
+        assets.enabled = False  # Hundreds of moves a second would be one long noise
+    
+    profiler.instrument(game)
+    if args.profile:
+        profiler.export_prefix = args.profile
+        profiler.enable()
     
-    while True:
-        game.handle_events()
+    # Show the first frame before any audio work starts
+    game.draw()
+    record_startup("first frame", time.perf_counter() - startup_begin)
+    if STARTUP_REPORT:
+        print(startup_report())
+    assets.start_loading()
+    
+    start = time.perf_counter()
+    try:
+        run_loop(game, checkpointer, args.games)
+    finally:
+        # Closing the window leaves through sys.exit(), so this is the only
+        # place the queued snapshot is sure to be written
+        if checkpointer is not None:
+            checkpointer.close()
+        if args.profile:
+            profiler.export()
+    elapsed = time.perf_counter() - start
+    print(f"{game.games_finished} games, {game.turns_finished} turns in {elapsed:.2f} s "
+          f"({game.turns_finished / elapsed:.0f} turns/s)")
+    pygame.quit()
+
+def run_loop(game, checkpointer, max_games=0):
+    last_checkpoint = None
+    last_checkpoint_time = 0
+    while not max_games or game.games_finished < max_games:
+        if game.is_animating():
+            events = pygame.event.get()
+        else:
+            # Nothing is moving: sleep until the player does something
+            event = pygame.event.wait(game.idle_wait_ms())
+            events = ([] if event.type == NOEVENT else [event]) + pygame.event.get()
+        
+        # Waiting for events is not part of the frame
+        profiler.begin_frame()
+        game.handle_events(events)
         game.update()
         game.draw()
-        clock.tick(60)
+        profiler.end_frame()
+        profiler.draw_overlay(screen)
+        
+        # Checkpoints are encoded here (well under a millisecond) and written
+        # to disk on the checkpointer's own thread
+        if checkpointer is not None and game.game_state in ("game", "game_over"):
+            now = pygame.time.get_ticks()
+            state = (game.engine.turn, game.game_state, game.dice_rolling, game.animation_index)
+            if state != last_checkpoint and now - last_checkpoint_time >= CHECKPOINT_INTERVAL_MS:
+                checkpointer.submit(capture(game))
+                last_checkpoint = state
+                last_checkpoint_time = now
+        
+        if game.is_animating() and not game.turbo:
+            clock.tick(FPS)
+        else:
+            clock.tick()  # Keep the clock current without sleeping
 
 if __name__ == "__main__":
     main()
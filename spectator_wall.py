@@ -0,0 +1,229 @@
+import argparse
+import math
+import random
+
+import pygame
+from pygame.locals import *
+
+import snake_and_ladders as view
+from asset_manager import LazyFont
+from board_view import Camera, CellOccupancy
+from game_engine import GameEngine, board_hash, random_layout
+from timestep import FixedTimestep
+
+DEFAULT_MATCHES = 16
+TURN_MS = 600  # Each match rolls this often
+RESTART_MS = 3000  # A finished match shows its winner this long, then starts over
+TILE_GAP = 4
+TILE_BACKGROUND = (40, 40, 40)
+CAPTION_COLOR = (230, 230, 230)
+
+
+class WallMatch:
+    # One bot match on the wall. It rolls on its own fixed timestep, so a
+    # slow frame makes it catch up rather than fall behind
+    __slots__ = ("engine", "timestep", "board_key", "finished_ms")
+
+    def __init__(self, engine, now_ms, turn_ms=TURN_MS, phase=0.0):
+        self.engine = engine
+        self.timestep = FixedTimestep(turn_ms)
+        self.timestep.reset(now_ms)
+        self.timestep.accumulator = phase * turn_ms  # Matches are staggered so tiles change a few at a time
+        self.board_key = board_hash(engine.snakes, engine.ladders, engine.last_cell)
+        self.finished_ms = None
+
+    def update(self, now_ms, restart_ms=RESTART_MS):
+        engine = self.engine
+        if engine.winner is not None:
+            if now_ms - self.finished_ms >= restart_ms:
+                engine.reset(seed=random.randrange(2 ** 63))
+                self.timestep.reset(now_ms)
+            return
+        for _ in range(self.timestep.advance(now_ms)):
+            engine.apply_roll()
+            if engine.winner is not None:
+                self.finished_ms = now_ms
+                break
+
+    def state(self):
+        # Changes whenever anything shown on the tile does; a new game gets a new seed
+        return self.engine.turn, self.engine.winner, self.engine.seed
+
+
+class SpectatorWall:
+    # Many matches in one window, each drawn into its own subsurface tile.
+    # Tiles with the same board share one background drawn at tile size,
+    # every token comes from one atlas, and a tile is only redrawn when its
+    # match changed
+    def __init__(self, window, matches, columns=None):
+        self.window = window
+        self.matches = matches
+        width, height = window.get_size()
+        count = len(matches)
+        # The column count that gives the biggest boards, unless told otherwise
+        self.font = LazyFont("Arial", 12)
+        self.columns = columns or max(range(1, count + 1),
+                                      key=lambda cols: self.board_size(width, height, cols, count))
+        self.rows = math.ceil(count / self.columns)
+        tile_w = (width - TILE_GAP) // self.columns - TILE_GAP
+        tile_h = (height - TILE_GAP) // self.rows - TILE_GAP
+        self.tile_rects = [pygame.Rect(TILE_GAP + (index % self.columns) * (tile_w + TILE_GAP),
+                                       TILE_GAP + (index // self.columns) * (tile_h + TILE_GAP),
+                                       tile_w, tile_h)
+                           for index in range(count)]
+        self.tiles = [window.subsurface(rect) for rect in self.tile_rects]
+
+        self.caption_height = self.font.get_height() + 2
+        self.board_px = self.board_size(width, height, self.columns, count)
+        self.backgrounds = {}  # board key -> board drawn at board_px
+        self.atlases = {}  # token size -> one token per colour, side by side
+        self.tile_states = [None] * count
+
+    def board_size(self, width, height, columns, count):
+        # Side of the square board in a tile, below the caption line
+        tile_w = (width - TILE_GAP) // columns - TILE_GAP
+        tile_h = (height - TILE_GAP) // math.ceil(count / columns) - TILE_GAP
+        return max(8, min(tile_w, tile_h - self.font.get_height() - 2))
+
+    def board_background(self, match):
+        background = self.backgrounds.get(match.board_key)
+        if background is None:
+            # Drawn once straight at tile size by the game's board renderer;
+            # every tile showing this layout blits the same copy
+            engine = match.engine
+            grid_size = math.isqrt(engine.last_cell)
+            background = pygame.Surface((self.board_px, self.board_px)).convert()
+            camera = Camera((0, 0, self.board_px, self.board_px), grid_size, self.board_px / grid_size)
+            view.render_board(background, engine.snakes, engine.ladders, camera)
+            self.backgrounds[match.board_key] = background
+        return background
+
+    def token_atlas(self, token_px, count):
+        atlas = self.atlases.get(token_px)
+        if atlas is None or atlas.get_width() < count * token_px:
+            atlas = pygame.Surface((count * token_px, token_px), SRCALPHA)
+            radius = token_px // 2
+            for index in range(count):
+                center = (index * token_px + radius, radius)
+                pygame.draw.circle(atlas, view.player_color(index), center, radius)
+                pygame.draw.circle(atlas, view.BLACK, center, radius, 1)
+            self.atlases[token_px] = atlas
+        return atlas
+
+    def draw_tile(self, index):
+        tile = self.tiles[index]
+        match = self.matches[index]
+        engine = match.engine
+        tile.fill(TILE_BACKGROUND)
+
+        grid_size = math.isqrt(engine.last_cell)
+        cell_px = self.board_px / grid_size
+        token_px = max(3, round(cell_px * view.PLAYER_SIZE / view.CELL_SIZE))
+        atlas = self.token_atlas(token_px, len(engine.players))
+
+        # Caption: match number, then the turn or the winner behind their token
+        tile.blit(view.text_cache.render(self.font, f"#{index + 1}", True, CAPTION_COLOR), (2, 1))
+        if engine.winner is not None:
+            status = view.text_cache.render(self.font, f"{engine.players[engine.winner].name} wins",
+                                            True, CAPTION_COLOR)
+            status_rect = status.get_rect(topright=(tile.get_width() - 2, 1))
+            tile.blit(atlas, (status_rect.x - token_px - 3, status_rect.centery - token_px // 2),
+                      (engine.winner * token_px, 0, token_px, token_px))
+        else:
+            status = view.text_cache.render(self.font, f"Turn {engine.turn}", True, CAPTION_COLOR)
+            status_rect = status.get_rect(topright=(tile.get_width() - 2, 1))
+        tile.blit(status, status_rect)
+
+        board = self.board_background(match)
+        board_rect = board.get_rect(center=(tile.get_width() // 2,
+                                            (self.caption_height + tile.get_height()) // 2))
+        tile.blit(board, board_rect)
+
+        # Tokens stacked per cell by the game's own token renderer
+        camera = Camera(tuple(board_rect), grid_size, cell_px)
+        occupancy = CellOccupancy(token_px)
+        occupancy.rebuild(engine.players.positions)
+        view.render_tokens(tile, camera, occupancy,
+                           lambda seat: (atlas, (seat * token_px, 0, token_px, token_px)))
+
+    def draw(self, force=False):
+        # Redraw the tiles whose match changed and push only those to the screen
+        if force:
+            self.window.fill(view.BLACK)
+        changed = []
+        for index, match in enumerate(self.matches):
+            state = match.state()
+            if force or state != self.tile_states[index]:
+                self.draw_tile(index)
+                self.tile_states[index] = state
+                changed.append(self.tile_rects[index])
+        if force:
+            pygame.display.flip()
+        elif changed:
+            pygame.display.update(changed)
+        return changed
+
+
+def create_matches(count, players, grid_size, now_ms, turn_ms=TURN_MS, seed=None):
+    # A tournament round: every match on the same board, each with its own dice
+    rng = random.Random(seed)
+    last_cell = grid_size * grid_size
+    if grid_size == view.GRID_SIZE:
+        snakes = ladders = None
+    else:
+        snakes, ladders = random_layout(last_cell, seed=rng.randrange(2 ** 63))
+    matches = []
+    for index in range(count):
+        engine = GameEngine(snakes, ladders, last_cell=last_cell, seed=rng.randrange(2 ** 63))
+        for seat in range(players):
+            engine.add_player(f"P{seat + 1}", color=view.player_color(seat), token_index=seat)
+        matches.append(WallMatch(engine, now_ms, turn_ms, phase=index / count))
+    return matches
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch many Snake and Ladders matches at once")
+    parser.add_argument("--matches", type=int, default=DEFAULT_MATCHES)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--grid-size", type=int, default=view.GRID_SIZE)
+    parser.add_argument("--turn-ms", type=int, default=TURN_MS, help="milliseconds between a match's rolls")
+    parser.add_argument("--size", type=parse_size, default=(view.SCREEN_WIDTH, view.SCREEN_HEIGHT),
+                        metavar="WxH", help="window size")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if args.matches < 1:
+        parser.error("--matches must be at least 1")
+    if not 2 <= args.players <= view.MAX_PLAYERS:
+        parser.error(f"--players must be between 2 and {view.MAX_PLAYERS}")
+    if not 2 <= args.grid_size <= view.MAX_GRID_SIZE:
+        parser.error(f"--grid-size must be between 2 and {view.MAX_GRID_SIZE}")
+
+    window = view.init_display(args.size)
+    pygame.display.set_caption("Snake and Ladders - Spectator Wall")
+    matches = create_matches(args.matches, args.players, args.grid_size, pygame.time.get_ticks(),
+                             args.turn_ms, args.seed)
+    wall = SpectatorWall(window, matches)
+
+    force = True
+    while True:
+        for event in pygame.event.get():
+            if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                pygame.quit()
+                return
+            if event.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+                force = True
+        now = pygame.time.get_ticks()
+        for match in matches:
+            match.update(now)
+        wall.draw(force)
+        force = False
+        view.clock.tick(view.FPS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from batch_simulator import build_jump_table, build_move_table, simulate
+from game_engine import GameEngine
+from markov_analysis import analyse_board, seat_win_probabilities
+
+
+def test_move_table_applies_overshoot_and_jumps():
+    move = build_move_table(build_jump_table({50: 10}, {95: 100}), 100)
+    assert move[97, 4] == 97  # Overshoot stays put
+    assert move[97, 3] == 100
+    assert move[46, 4] == 10
+    assert move[93, 2] == 100  # Ladder to the last cell
+
+
+@pytest.mark.parametrize("n_players", [2, 4])
+def test_win_rates_match_the_exact_odds(n_players):
+    result = simulate(200_000, n_players, seed=1)
+    exact = seat_win_probabilities(analyse_board(use_cache=False)["turn_distribution"], n_players)
+    assert result["unfinished"] == 0
+    assert result["length_histogram"].sum() == 200_000
+    np.testing.assert_allclose(result["win_rates"], exact, atol=0.006)
+
+
+def test_mean_length_matches_engine_play():
+    result = simulate(100_000, 3, seed=2)
+    lengths = []
+    for seed in range(2000):
+        engine = GameEngine(seed=seed)
+        for seat in range(3):
+            engine.add_player(f"P{seat + 1}")
+        engine.play_game()
+        lengths.append(engine.turn)
+    assert abs(result["mean_length"] - np.mean(lengths)) < 2.5
+
+
+def test_same_seed_same_result():
+    first, second = simulate(10_000, 2, seed=3), simulate(10_000, 2, seed=3)
+    assert (first["winner_counts"] == second["winner_counts"]).all()
+    assert (first["length_histogram"] == second["length_histogram"]).all()
@@ -0,0 +1,63 @@
+from game_engine import GameEngine
+
+
+def engine_with_players(count=2, snakes=None, ladders=None, last_cell=100):
+    engine = GameEngine(snakes, ladders, last_cell, seed=1)
+    for seat in range(count):
+        engine.add_player(f"P{seat + 1}")
+    return engine
+
+
+def test_overshoot_stays_put_and_passes_the_turn():
+    engine = engine_with_players(snakes={}, ladders={})
+    engine.players[0].position = 97
+    move = engine.apply_roll(4)
+    assert move.path == [97]
+    assert move.jump is None
+    assert engine.players[0].position == 97
+    assert engine.winner is None
+    assert engine.current_player == 1
+    assert engine.turn == 1
+
+
+def test_exact_roll_onto_last_cell_wins():
+    engine = engine_with_players(snakes={}, ladders={})
+    engine.players[0].position = 97
+    engine.apply_roll(3)
+    assert engine.winner == 0
+    assert engine.current_player == 0  # The turn is not passed on after a win
+
+
+def test_ladder_to_last_cell_wins():
+    engine = engine_with_players(snakes={}, ladders={95: 100})
+    engine.players[0].position = 93
+    move = engine.apply_roll(2)
+    assert move.path == [93, 94, 95, 100]
+    assert move.jump == "ladder"
+    assert engine.winner == 0
+
+
+def test_snake_takes_the_token_down():
+    engine = engine_with_players(snakes={50: 10}, ladders={})
+    engine.players[0].position = 46
+    move = engine.apply_roll(4)
+    assert move.jump == "snake"
+    assert move.end == 10
+    assert engine.players[0].position == 10
+
+
+def test_plan_move_changes_nothing_until_committed():
+    engine = engine_with_players()
+    before = engine.state_hash()
+    move = engine.plan_move(6)
+    assert engine.state_hash() == before
+    engine.commit_move(move)
+    assert engine.players[0].position == move.end
+    assert engine.state_hash() != before
+
+
+def test_same_seed_plays_the_same_game():
+    first, second = engine_with_players(4), engine_with_players(4)
+    assert first.play_game() == second.play_game()
+    assert first.turn == second.turn
+    assert list(first.players.positions) == list(second.players.positions)
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+
+import snake_and_ladders as view
+from lockstep import LockstepSession, run_relay
+from match_client import free_port
+
+HOST = "127.0.0.1"
+
+
+@pytest.fixture(scope="module")
+def relay_port():
+    port = free_port(HOST)
+    ready = threading.Event()
+    threading.Thread(target=run_relay, args=(HOST, port, ready), daemon=True).start()
+    assert ready.wait(5)
+    return port
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def online_games(port, room, names):
+    sessions = [LockstepSession(HOST, port, room, len(names), name) for name in names]
+    games = []
+    for session in sessions:
+        assert session.wait_for_start(5)
+        game = view.EnhancedSnakeAndLadderGame()
+        for name in session.names:
+            game.add_player(name)
+        game.net = session
+        game.start_game(seed=session.seed)
+        game.turbo = True  # Each roll and move plays out in one update
+        games.append(game)
+    return games
+
+
+def play(games, until, timeout=10.0):
+    # Let every game roll whenever it may until until() holds
+    def step():
+        for game in games:
+            if game.game_state == "game" and game.can_roll():
+                game.roll_dice()
+            game.update()
+        return until()
+    assert wait_until(step, timeout)
+
+
+def test_leaving_through_the_menu_closes_the_session(relay_port):
+    ann, bob = online_games(relay_port, 100, ["Ann", "Bob"])
+    play([ann, bob], lambda: ann.engine.turn >= 4 and bob.engine.turn == ann.engine.turn)
+    session = ann.net
+    ann.handle_click("menu")
+    assert ann.game_state == "menu"
+    assert ann.net is None
+    assert session.closed or wait_until(lambda: session.closed)
+
+    # Bob hears that Ann left and, as the last seat playing, wins
+    play([bob], lambda: bob.winner is not None)
+    assert bob.winner == bob.net.seat
+
+    # Ann's next game is a local one that nothing online holds up
+    ann.add_player("Cy")
+    ann.start_game()
+    assert ann.can_roll()
+
+
+def test_peer_leaving_before_the_room_fills_frees_its_seat(relay_port):
+    early = LockstepSession(HOST, relay_port, 101, 2, "early")
+    early.close()
+    assert wait_until(lambda: early.closed)
+    time.sleep(0.1)  # Let the relay see the disconnect before anybody else joins
+    late = LockstepSession(HOST, relay_port, 101, 2, "late")
+    other = LockstepSession(HOST, relay_port, 101, 2, "other")
+    try:
+        assert late.wait_for_start(5) and other.wait_for_start(5)
+        assert late.names == other.names == ["late", "other"]
+        assert (late.seat, other.seat) == (0, 1)
+        assert late.departed() == frozenset()
+    finally:
+        late.close()
+        other.close()
+
+
+def sessions_in_room(port, room, names):
+    sessions = [LockstepSession(HOST, port, room, len(names), name) for name in names]
+    for session in sessions:
+        assert session.wait_for_start(5)
+    return sessions
+
+
+def test_start_rolls_and_acks(relay_port):
+    sessions = sessions_in_room(relay_port, 102, ["Ann", "Bob", "Cy"])
+    try:
+        assert [session.seat for session in sessions] == [0, 1, 2]
+        assert all(session.names == ["Ann", "Bob", "Cy"] for session in sessions)
+        assert len({session.seed for session in sessions}) == 1
+
+        ann, bob, cy = sessions
+        assert ann.can_roll(0, 0) and not bob.can_roll(0, 0)
+        ann.send_roll(0, 4, 1234)
+        for peer in (bob, cy):
+            assert wait_until(lambda: 0 in peer.rolls)
+            assert peer.take_roll(0, 1234) == 4
+        for session in sessions:
+            session.send_ack(1, 99)
+        assert wait_until(lambda: not ann.waiting_for(1))
+        assert bob.can_roll(1, 1)
+        assert all(session.desync is None for session in sessions)
+
+        # A peer that ends up somewhere else is reported
+        bob.send_ack(2, 1)
+        ann.send_ack(2, 2)
+        assert wait_until(lambda: ann.desync is not None)
+        assert "Bob" in ann.desync
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def test_disconnect_is_announced(relay_port):
+    ann, bob, cy = sessions_in_room(relay_port, 103, ["Ann", "Bob", "Cy"])
+    try:
+        cy.close()
+        assert wait_until(lambda: ann.departed() == bob.departed() == frozenset({2}))
+        ann.send_ack(1, 7)
+        bob.send_ack(1, 7)
+        assert wait_until(lambda: not ann.waiting_for(1))  # Cy's ack is not waited for
+    finally:
+        ann.close()
+        bob.close()
+
+
+def test_games_carry_on_without_a_peer_that_left(relay_port):
+    games = online_games(relay_port, 104, ["Ann", "Bob", "Cy"])
+    play(games, lambda: all(game.engine.turn >= 5 for game in games))
+    games[1].net.close()
+    rest = [games[0], games[2]]
+    play(rest, lambda: all(game.winner is not None for game in rest), timeout=20)
+    assert rest[0].engine.state_hash() == rest[1].engine.state_hash()
+    assert all(game.net.desync is None for game in rest)
+    for game in rest:
+        game.net.close()
@@ -0,0 +1,62 @@
+import numpy as np
+
+import markov_analysis
+from game_engine import LAST_CELL, GameEngine
+from markov_analysis import analyse_board, hit_probabilities
+
+
+def test_exact_roll_board_is_geometric():
+    # From cell 1 of a 7-cell board only a 6 finishes, so turns are geometric
+    result = analyse_board({}, {}, last_cell=7, use_cache=False)
+    assert abs(result["expected_turns"] - 6.0) < 1e-9
+    distribution = result["turn_distribution"]
+    np.testing.assert_allclose(distribution[1:4], [1 / 6, 5 / 36, 25 / 216])
+    assert abs(distribution.sum() - 1.0) < 1e-9
+
+
+def test_distribution_agrees_with_expected_turns():
+    result = analyse_board(use_cache=False)
+    distribution = result["turn_distribution"]
+    assert abs(distribution.sum() - 1.0) < 1e-9
+    mean = (np.arange(distribution.size) * distribution).sum()
+    assert abs(mean - result["expected_turns"]) < 1e-6
+
+
+def solo_games(count):
+    # Turns taken and cells landed on (before any jump) in one-player games
+    turns, landings = [], np.zeros(LAST_CELL + 1)
+    for seed in range(count):
+        engine = GameEngine(seed=seed)
+        engine.add_player("Solo")
+        landed = set()
+        while engine.winner is None:
+            move = engine.apply_roll()
+            if move.start + move.dice_value <= LAST_CELL:
+                landed.add(move.start + move.dice_value)
+        landings[list(landed)] += 1
+        turns.append(engine.turn)
+    return np.array(turns), landings / count
+
+
+def test_matches_engine_play():
+    turns, landings = solo_games(3000)
+    result = analyse_board(use_cache=False)
+    assert abs(turns.mean() - result["expected_turns"]) < 1.5
+    hits = hit_probabilities()
+    np.testing.assert_allclose(hits[2:LAST_CELL], landings[2:LAST_CELL], atol=0.03)
+    assert hits[LAST_CELL] == 1.0
+
+
+def test_disk_cache_round_trip(tmp_path, monkeypatch):
+    # SNAKE_LADDERS_CACHE is only read at import, so the directory is patched
+    monkeypatch.setattr(markov_analysis, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(markov_analysis, "_memory_cache", {})
+    solved = analyse_board({20: 3}, {4: 30}, last_cell=36)
+    assert len(list(tmp_path.glob("markov-*.npz"))) == 1
+
+    markov_analysis._memory_cache.clear()
+    loaded = analyse_board({20: 3}, {4: 30}, last_cell=36)
+    assert loaded is not solved
+    assert loaded["expected_turns"] == solved["expected_turns"]
+    for name in ("expected_turns_from", "turn_distribution", "hit_probabilities"):
+        np.testing.assert_array_equal(loaded[name], solved[name])
@@ -0,0 +1,82 @@
+import json
+
+from match_server import MatchProtocol, MatchServer
+
+
+class FakeTransport:
+    # Collects what the protocol writes, one decoded message per line
+    def __init__(self):
+        self.messages = []
+        self.closed = False
+
+    def write(self, data):
+        self.messages.extend(json.loads(line) for line in data.splitlines())
+
+    def close(self):
+        self.closed = True
+
+    def is_closing(self):
+        return self.closed
+
+
+def connect(server):
+    protocol = MatchProtocol(server)
+    protocol.connection_made(FakeTransport())
+    return protocol
+
+
+def send(protocol, **request):
+    # Reply to this request, sent back to protocol
+    sent = len(protocol.transport.messages)
+    protocol.data_received(json.dumps(request).encode() + b"\n")
+    return protocol.transport.messages[sent:][-1]
+
+
+def test_create_join_roll_leave():
+    server = MatchServer()
+    ann, bob = connect(server), connect(server)
+    created = send(ann, op="create", players=["Ann", "Bob"], seq=1)
+    assert created["type"] == "created" and created["players"] == ["Ann", "Bob"] and created["seq"] == 1
+    match_id = created["match"]
+
+    joined = send(bob, op="join", match=match_id, seq=1)
+    assert joined["positions"] == [1, 1] and joined["current"] == 0
+
+    delta = send(ann, op="roll", match=match_id, seq=2)
+    assert delta["type"] == "delta" and delta["turn"] == 1 and delta["seq"] == 2
+    assert bob.transport.messages[-1] == {key: value for key, value in delta.items() if key != "seq"}
+
+    assert send(ann, op="leave", match=match_id)["type"] == "left"
+    assert match_id in server.matches  # Bob still watches it
+    bob.connection_lost(None)
+    assert match_id not in server.matches
+
+
+def test_finished_match_is_dropped():
+    server = MatchServer()
+    ann = connect(server)
+    match_id = send(ann, op="create", players=["Ann"])["match"]
+    delta = None
+    while delta is None or delta["winner"] is None:
+        delta = send(ann, op="roll", match=match_id)
+    assert match_id not in server.matches
+    assert not ann.watched
+
+
+def test_only_watchers_roll_or_leave():
+    server = MatchServer()
+    ann, eve = connect(server), connect(server)
+    match_id = send(ann, op="create", players=["Ann", "Bob"])["match"]
+    for op in ("roll", "leave"):
+        reply = send(eve, op=op, match=match_id)
+        assert reply["type"] == "error"
+    assert server.matches[match_id].engine.turn == 0
+    assert len(ann.transport.messages) == 1  # Just the created reply
+
+
+def test_players_must_be_a_list_of_names():
+    server = MatchServer()
+    ann = connect(server)
+    for players in ("abc", ["Ann", 3], None):
+        assert send(ann, op="create", players=players)["type"] == "error"
+    assert not server.matches
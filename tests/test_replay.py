@@ -0,0 +1,52 @@
+import pytest
+
+from game_engine import GameEngine, random_layout
+from replay import Replay
+
+
+def recorded_match(names=("Ann", "Bob", "Cy"), last_cell=100, seed=7):
+    snakes, ladders = (None, None) if last_cell == 100 else random_layout(last_cell, seed=seed)
+    engine = GameEngine(snakes, ladders, last_cell, seed=seed)
+    for name in names:
+        engine.add_player(name)
+    replay = Replay.for_engine(engine, snapshot_interval=8)
+    states = [engine.state_hash()]
+    while engine.winner is None:
+        move = engine.apply_roll()
+        replay.record(move.dice_value)
+        states.append(engine.state_hash())
+    return replay, states
+
+
+def test_bytes_round_trip():
+    replay, _ = recorded_match(names=("Ann", "Zoë", "x" * 300), last_cell=400)
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert loaded.to_bytes() == replay.to_bytes()
+    assert loaded.snakes == replay.snakes and loaded.ladders == replay.ladders
+    assert loaded.names == ["Ann", "Zoë", "x" * 255]  # Names are cut to 255 bytes
+    assert loaded.seed == replay.seed
+    assert loaded.dice == replay.dice
+    assert loaded.verify() is None
+
+
+def test_save_and_load(tmp_path):
+    replay, _ = recorded_match()
+    path = tmp_path / "match.snlr"
+    replay.save(path)
+    assert Replay.load(path).to_bytes() == replay.to_bytes()
+
+
+def test_seek_matches_every_turn():
+    replay, states = recorded_match()
+    loaded = Replay.from_bytes(replay.to_bytes())
+    for turn in (0, 1, 7, 8, 9, replay.turns // 2, replay.turns):
+        assert loaded.seek(turn).state_hash() == states[turn]
+    with pytest.raises(IndexError):
+        loaded.seek(replay.turns + 1)
+
+
+def test_rejects_other_files():
+    data = bytearray(recorded_match()[0].to_bytes())
+    data[:4] = b"NOPE"
+    with pytest.raises(ValueError):
+        Replay.from_bytes(bytes(data))
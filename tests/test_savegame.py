@@ -0,0 +1,68 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import snake_and_ladders as view
+from savegame import SnapshotView, capture, write_snapshot
+
+
+def game_in_mid_move(players=3, turns=10):
+    # A game whose token is part-way along its path after turns moves
+    game = view.EnhancedSnakeAndLadderGame()
+    for seat in range(players):
+        game.add_player(f"P{seat + 1}")
+    game.start_game(seed=11)
+    while game.engine.turn < turns or not (game.moving_animation and game.animation_index >= 2):
+        if not (game.dice_rolling or game.moving_animation):
+            game.roll_dice()
+        game.step()
+    return game
+
+
+def play_on(game, turns):
+    # Step the game, rolling whenever it is idle, until turns more moves are done
+    target = game.engine.turn + turns
+    while game.engine.turn < target and game.winner is None:
+        if not (game.dice_rolling or game.moving_animation):
+            game.roll_dice()
+        game.step()
+
+
+def restore(source):
+    with SnapshotView(source) as snapshot:
+        game = view.EnhancedSnakeAndLadderGame(engine=snapshot.engine())
+        snapshot.apply(game)
+    return game
+
+
+def test_capture_and_apply_round_trip_mid_move():
+    game = game_in_mid_move()
+    data = capture(game)
+    restored = restore(data)
+    assert capture(restored) == data
+    assert restored.pending_move is not None
+    assert restored.moving_cell() == game.moving_cell()
+    assert restored.occupancy.count == len(game.players) - 1  # The moving token is not stacked
+
+
+def test_restored_game_continues_identically(tmp_path):
+    game = game_in_mid_move()
+    path = tmp_path / "game.snls"
+    write_snapshot(path, capture(game))
+    restored = restore(path)
+    play_on(game, 30)
+    play_on(restored, 30)
+    assert restored.engine.state_hash() == game.engine.state_hash()
+    assert restored.replay.dice == game.replay.dice
+
+
+def test_view_reads_fields_without_decoding():
+    game = game_in_mid_move(players=4)
+    with SnapshotView(capture(game)) as snapshot:
+        assert snapshot.state == "game"
+        assert snapshot.pending
+        assert snapshot.names() == ["P1", "P2", "P3", "P4"]
+        assert snapshot.board() == (game.engine.snakes, game.engine.ladders)
+        with snapshot.positions() as positions:
+            assert positions.tolist() == list(game.players.positions)
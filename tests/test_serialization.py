@@ -0,0 +1,30 @@
+import pytest
+
+from serialization import atomic_write, pack_board, pack_names, unpack_board, unpack_names
+
+
+def test_names_round_trip_from_an_offset():
+    data = b"head" + pack_names(["Ann", "", "Zoë"]) + b"tail"
+    names, offset = unpack_names(data, 3, 4)
+    assert names == ["Ann", "", "Zoë"]
+    assert data[offset:] == b"tail"
+
+
+@pytest.mark.parametrize("data", [b"", b"\x05abc"])
+def test_truncated_names_raise_value_error(data):
+    with pytest.raises(ValueError):
+        unpack_names(data, 1)
+
+
+def test_board_round_trip():
+    snakes, ladders = {99: 5, 40: 3}, {4: 14, 71: 91}
+    data = pack_board(snakes, ladders)
+    assert unpack_board(data, 2, 2) == (snakes, ladders, len(data))
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"old")
+    atomic_write(path, b"new", durable=True)
+    assert path.read_bytes() == b"new"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["file.bin"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import markov_analysis
+from markov_analysis import (PASSAGE_PENDING, analyse_board, first_passage_table, passage_table,
+                             seat_win_probabilities, win_probabilities)
+
+
+def test_table_rows_are_cumulative_turn_distributions():
+    table = first_passage_table()
+    finished = np.cumsum(analyse_board(use_cache=False)["turn_distribution"])
+    columns = min(table.shape[1], finished.size)
+    np.testing.assert_allclose(table[1, :columns], finished[:columns], atol=1e-6)
+    assert table[100, 0] == 1.0  # Already home
+    assert table[1:, -1].min() >= 1.0 - markov_analysis.PASSAGE_TAIL - 1e-6
+
+
+@pytest.mark.parametrize("n_players", [2, 3, 4])
+def test_start_of_game_odds_match_seat_odds(n_players):
+    table = first_passage_table()
+    exact = seat_win_probabilities(analyse_board(use_cache=False)["turn_distribution"], n_players)
+    np.testing.assert_allclose(win_probabilities(table, [1] * n_players, 0), exact, atol=1e-3)
+
+
+def test_odds_follow_the_player_to_roll():
+    table = first_passage_table()
+    odds = win_probabilities(table, [1, 1], 1)
+    assert odds[1] > odds[0]
+    assert abs(odds.sum() - 1.0) < 1e-9
+    # A token one roll from home is far ahead of one on the start
+    assert win_probabilities(table, [95, 1], 1)[0] > 0.9
+
+
+def test_background_build(monkeypatch):
+    monkeypatch.setattr(markov_analysis, "_memory_cache", {})
+    monkeypatch.setattr(markov_analysis, "_passage_builds", {})
+    snakes, ladders = {30: 7}, {5: 25}
+    first = passage_table(snakes, ladders, 36, wait=False)
+    table = passage_table(snakes, ladders, 36)  # Waits for the build started above
+    assert first is PASSAGE_PENDING or first is table
+    assert passage_table(snakes, ladders, 36, wait=False) is table
+    np.testing.assert_array_equal(table, first_passage_table(snakes, ladders, 36))
+
+
+def test_too_big_boards_get_no_table(monkeypatch):
+    monkeypatch.setattr(markov_analysis, "MAX_PASSAGE_ENTRIES", 101 * 10)
+    assert first_passage_table() is None
@@ -0,0 +1,34 @@
+MAX_CATCH_UP_MS = 10_000  # Longest stall that is caught up on; anything beyond is dropped
+
+
+class FixedTimestep:
+    # Turns real elapsed time into whole simulation steps of step_ms. A slow
+    # or stalled frame gets all the steps it missed, so the simulation keeps
+    # real time whatever the frame rate; the time left over is reported as a
+    # fraction of a step for drawing between two simulated states
+    def __init__(self, step_ms, time_scale=1.0):
+        self.step_ms = step_ms
+        self.time_scale = time_scale  # 2.0 runs the simulation twice as fast
+        self.last_ms = None
+        self.accumulator = 0.0
+
+    def reset(self, now_ms):
+        # Start counting from now, e.g. when an animation begins
+        self.last_ms = now_ms
+        self.accumulator = 0.0
+
+    def advance(self, now_ms):
+        # Number of steps due since the last call
+        if self.last_ms is None:
+            self.reset(now_ms)
+            return 0
+        elapsed = min((now_ms - self.last_ms) * self.time_scale, MAX_CATCH_UP_MS)
+        self.last_ms = now_ms
+        self.accumulator += max(0.0, elapsed)
+        steps = int(self.accumulator // self.step_ms)
+        self.accumulator -= steps * self.step_ms
+        return steps
+
+    def alpha(self):
+        # How far the simulation is into the next step, from 0 up to 1
+        return self.accumulator / self.step_ms